@@ -3,7 +3,7 @@ from datetime import timedelta
 
 from celery import Celery
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tunerguy.settings.dev")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.dev")
 
 app = Celery(
     "tunerguy", broker=os.environ.get("REDIS_URL", "redis://localhost:6379/0")
@@ -17,10 +17,19 @@ app.autodiscover_tasks()
 # https://docs.celeryq.dev/en/stable/userguide/periodic-tasks.html
 @app.on_after_finalize.connect
 def setup_periodic_tasks(sender, **kwargs):
-    from tunerguy.apps.blog.tasks import update_reddit
+    from tunerguy.blog.tasks import (
+        dispatch_due_reddit_refreshes,
+        verify_pending_subreddits,
+    )
 
-    # Update all RedditEmbed's with the latest posts from their respective subreddit's.
+    # Update the RedditEmbed's due a refresh with the latest posts from their
+    # respective subreddit's. Each embed's due time adapts to its subreddit.
+    sender.add_periodic_task(
+        timedelta(minutes=15),
+        dispatch_due_reddit_refreshes.s(),
+    )
+    # Confirm subreddits that couldn't be verified when their embed was saved.
     sender.add_periodic_task(
-        timedelta(hours=24),
-        update_reddit.s(),
+        timedelta(minutes=15),
+        verify_pending_subreddits.s(),
     )
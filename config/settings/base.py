@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     "tunerguy.base",
     "tunerguy.blog",
     "wagtail.contrib.forms",
+    "wagtail.contrib.routable_page",
     "wagtail.contrib.redirects",
     "wagtail.embeds",
     "wagtail.sites",
@@ -196,3 +197,82 @@ LOGGING = {
         },
     },
 }
+
+# Caches
+# Shared through Redis when REDIS_URL is set, otherwise local to each process.
+if "REDIS_URL" in os.environ:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# Full responses of anonymous page views are cached for PAGE_CACHE_TIMEOUT
+# seconds, or until the page or one of its descendants is (un)published.
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_TIMEOUT = 60 * 15
+# Rendered StreamFields are cached per live revision for STREAM_CACHE_TIMEOUT
+# seconds, see the ``{% streamcache %}`` tag.
+STREAM_CACHE_TIMEOUT = 60 * 60 * 24
+# Breadcrumbs and the site menu are cached for NAVIGATION_CACHE_TIMEOUT
+# seconds, or until the pages they show are published or moved.
+NAVIGATION_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Blog
+# Number of latest posts listed per category on car hub pages.
+CATEGORY_LATEST_POSTS = 3
+# Number of posts per page of a category's listing, further pages are loaded as
+# the reader scrolls.
+CATEGORY_PAGE_SIZE = 12
+
+# Redis, shared by Celery and the task locks.
+REDIS_URL = os.environ.get("REDIS_URL", "redis://localhost:6379/0")
+# Seconds a task lock is held for without renewal, i.e. how long it outlives a
+# worker that died holding it.
+TASK_LOCK_LEASE = 60 * 5
+# Chords need a result backend: ``update_reddit`` collects its subtasks'
+# results in ``store_reddit_posts``. Results are dropped after an hour.
+CELERY_RESULT_BACKEND = REDIS_URL
+CELERY_RESULT_EXPIRES = 60 * 60
+
+# Reddit
+# Maximum number of subtasks ``update_reddit`` fans out to at once.
+REDDIT_REFRESH_CONCURRENCY = 4
+# Seconds a subreddit's moderator list is cached for.
+REDDIT_MODERATORS_CACHE_TTL = 60 * 60 * 24
+# Seconds an admin form waits on Reddit to confirm a subreddit exists before
+# saving the embed as pending verification.
+REDDIT_LOOKUP_TIMEOUT = 2
+# Seconds a subreddit lookup is cached for, when found and when not found.
+REDDIT_FOUND_CACHE_TTL = 60 * 60 * 24 * 7
+REDDIT_NOT_FOUND_CACHE_TTL = 60 * 60
+# Number of hot posts fetched per subreddit. The eligible ones are stored and
+# REDDIT_POSTS_SHOWN of them are shown at a time, rotating every
+# REDDIT_ROTATION_WINDOW seconds.
+REDDIT_POST_POOL_SIZE = 10
+REDDIT_POSTS_SHOWN = 2
+REDDIT_ROTATION_WINDOW = 60 * 60 * 24
+# Thumbnails of fetched posts are stored locally for server-rendered cards.
+REDDIT_THUMBNAIL_TIMEOUT = 5
+REDDIT_THUMBNAIL_MAX_BYTES = 256 * 1024
+# Pace requests to Reddit, which allows 100 requests per minute per client. The
+# budget is kept in Redis and shared by every process.
+REDDIT_RATE_LIMIT_PER_MINUTE = 60
+REDDIT_RATE_LIMIT_BURST = 10
+# Bounds, in seconds, of the interval each embed is refreshed at. The interval
+# shrinks while a subreddit's top posts keep changing and grows while they don't.
+REDDIT_REFRESH_MIN_INTERVAL = 60 * 60
+REDDIT_REFRESH_MAX_INTERVAL = 60 * 60 * 24
+# Seconds a dispatched refresh has to complete before its embeds are due again.
+REDDIT_REFRESH_TIMEOUT = 60 * 60
+# Stop requesting a subreddit after REDDIT_BREAKER_THRESHOLD consecutive failures,
+# for REDDIT_BREAKER_BACKOFF seconds doubling up to REDDIT_BREAKER_MAX_BACKOFF.
+REDDIT_BREAKER_THRESHOLD = 3
+REDDIT_BREAKER_BACKOFF = 60 * 15
+REDDIT_BREAKER_MAX_BACKOFF = 60 * 60 * 24
@@ -0,0 +1,49 @@
+// Loads the next page of posts into [data-infinite-scroll] when its
+// "More posts" link scrolls into view. The link still works without JavaScript.
+(function () {
+    const container = document.querySelector("[data-infinite-scroll]");
+    if (!container || !("IntersectionObserver" in window)) {
+        return;
+    }
+
+    let loading = false;
+    const observer = new IntersectionObserver(function (entries) {
+        entries.forEach(function (entry) {
+            if (entry.isIntersecting && !loading) {
+                loadNext(entry.target);
+            }
+        });
+    }, { rootMargin: "400px" });
+
+    function watch() {
+        const next = container.querySelector("[data-next-posts]");
+        if (next) {
+            observer.observe(next);
+        }
+    }
+
+    function loadNext(next) {
+        loading = true;
+        observer.unobserve(next);
+        fetch(next.dataset.nextPosts, { headers: { "Accept": "text/html" } })
+            .then(function (response) {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            })
+            .then(function (html) {
+                next.remove();
+                container.insertAdjacentHTML("beforeend", html);
+                watch();
+            })
+            .catch(function () {
+                // Leave the link in place so the reader can still follow it.
+            })
+            .finally(function () {
+                loading = false;
+            });
+    }
+
+    watch();
+})();
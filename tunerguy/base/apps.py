@@ -4,3 +4,24 @@ from django.apps import AppConfig
 class BaseConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tunerguy.base"
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+        from wagtail import signals
+        from wagtail.images import get_image_model
+
+        from .navigation import invalidate_breadcrumbs
+        from .page_cache import invalidate_object, invalidate_page
+
+        # Connected first, so the breadcrumbs are dropped before the cached
+        # pages showing them.
+        signals.page_published.connect(invalidate_breadcrumbs)
+        signals.post_page_move.connect(invalidate_breadcrumbs)
+
+        signals.page_published.connect(invalidate_page)
+        signals.page_unpublished.connect(invalidate_page)
+        post_delete.connect(invalidate_page)
+
+        image_model = get_image_model()
+        post_save.connect(invalidate_object, sender=image_model)
+        post_delete.connect(invalidate_object, sender=image_model)
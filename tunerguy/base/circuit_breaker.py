@@ -0,0 +1,146 @@
+"""
+circuit_breaker module
+
+This module provides a circuit breaker used to stop calling an external service,
+or one of its resources, after repeated failures.
+
+The breaker's state is kept in the Django cache so every web and Celery worker
+shares it, and so it can be queried for alerting.
+
+Module Classes:
+    - CircuitBreaker: Circuit breaker with exponential backoff.
+    - CircuitOpenError: Raised when a call is attempted while the circuit is open.
+"""
+
+import time
+
+from django.core.cache import cache
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is attempted while the circuit is open."""
+
+    def __init__(self, name, retry_at):
+        self.name = name
+        self.retry_at = retry_at
+        super().__init__(
+            f"Circuit {name} is open until {time.ctime(retry_at)}."
+        )
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with exponential backoff.
+
+    The circuit opens after ``threshold`` consecutive failures. While open, calls
+    are refused until the backoff has passed; the next call is then let through
+    ("half open"). Each further failure doubles the backoff, up to
+    ``max_backoff``; a success closes the circuit.
+
+    Attributes:
+        name (str): Identifies the breaker, e.g. "reddit:gti".
+        threshold (int): Consecutive failures that open the circuit.
+        backoff (float): Seconds the circuit first stays open for.
+        max_backoff (float): Maximum seconds the circuit stays open for.
+
+    Methods:
+        - allow(): Returns whether a call may be attempted.
+        - check(): Raises ``CircuitOpenError`` if a call may not be attempted.
+        - record_success(): Closes the circuit.
+        - record_failure(error): Counts a failure, opening the circuit if needed.
+        - state(): Returns the breaker's state.
+        - states(breakers): Returns the states of several breakers at once.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, threshold, backoff, max_backoff):
+        self.name = name
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    @property
+    def cache_key(self):
+        return f"breaker:{self.name}"
+
+    @staticmethod
+    def _closed_state():
+        return {"failures": 0, "open_until": None, "last_error": None}
+
+    def _load(self):
+        return cache.get(self.cache_key) or self._closed_state()
+
+    @classmethod
+    def _describe(cls, name, state):
+        state = state or cls._closed_state()
+        if state["open_until"] is None:
+            status = cls.CLOSED
+        elif state["open_until"] > time.time():
+            status = cls.OPEN
+        else:
+            status = cls.HALF_OPEN
+        return {"name": name, "status": status, **state}
+
+    def allow(self):
+        """Returns whether a call may be attempted."""
+        return self.state()["status"] != self.OPEN
+
+    def check(self):
+        """Raises ``CircuitOpenError`` if a call may not be attempted."""
+        state = self.state()
+        if state["status"] == self.OPEN:
+            raise CircuitOpenError(self.name, state["open_until"])
+
+    def record_success(self):
+        """Closes the circuit."""
+        cache.delete(self.cache_key)
+
+    def record_failure(self, error):
+        """
+        Counts a failure, opening the circuit once ``threshold`` is reached.
+
+        Args:
+            error (Exception): The error the call failed with.
+        """
+        state = self._load()
+        state["failures"] += 1
+        state["last_error"] = repr(error)
+        if state["failures"] >= self.threshold:
+            backoff = min(
+                self.backoff * 2 ** (state["failures"] - self.threshold),
+                self.max_backoff,
+            )
+            state["open_until"] = time.time() + backoff
+        # Forget the failures once the longest backoff has long passed.
+        cache.set(self.cache_key, state, self.max_backoff * 2)
+
+    def state(self):
+        """
+        Returns the breaker's state.
+
+        Returns:
+            dict: The breaker's ``name``, ``status`` ("closed", "open" or
+            "half_open"), consecutive ``failures``, ``open_until`` timestamp and
+            ``last_error``.
+        """
+        return self._describe(self.name, cache.get(self.cache_key))
+
+    @classmethod
+    def states(cls, breakers):
+        """
+        Returns the states of several breakers with a single cache read.
+
+        Args:
+            breakers (list): ``CircuitBreaker`` instances.
+
+        Returns:
+            list: The ``state()`` of each breaker.
+        """
+        cached = cache.get_many([breaker.cache_key for breaker in breakers])
+        return [
+            cls._describe(breaker.name, cached.get(breaker.cache_key))
+            for breaker in breakers
+        ]
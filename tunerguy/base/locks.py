@@ -0,0 +1,203 @@
+"""
+locks module
+
+This module provides a Redis-backed lock that keeps a task from running more
+than once at a time, across every worker and beat instance sharing the broker.
+
+The lock is a lease: it expires on its own if the worker holding it dies, and is
+renewed in the background while a long run is still going. Work spanning several
+tasks, e.g. a chord, holds a lease by its token instead: each task renews it and
+the last one releases it.
+
+Module Functions:
+    - get_redis(): Returns the shared Redis client.
+    - acquire_lease(name, lease=None): Takes a lock, returning its token.
+    - renew_lease(name, token, lease=None): Extends a lock held with a token.
+    - release_lease(name, token): Releases a lock held with a token.
+    - single_flight(name=None, lease=None): Decorator skipping a call while
+      another one holds the lock.
+    - skipped_runs(name): Returns how many calls were skipped for a lock.
+"""
+
+import functools
+import logging
+import threading
+import uuid
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+_redis_lock = threading.Lock()
+
+
+def get_redis():
+    """
+    Returns the shared Redis client, connecting to ``REDIS_URL``.
+
+    Returns:
+        redis.Redis: The client.
+    """
+    global _redis
+    with _redis_lock:
+        if _redis is None:
+            _redis = redis.Redis.from_url(settings.REDIS_URL)
+        return _redis
+
+
+def _lock_key(name):
+    return f"lock:{name}"
+
+
+def _skipped_key(name):
+    return f"lock:{name}:skipped"
+
+
+def skipped_runs(name):
+    """
+    Returns how many calls were skipped because the lock ``name`` was held.
+
+    Args:
+        name (str): The lock name.
+
+    Returns:
+        int: The number of skipped calls.
+    """
+    return int(get_redis().get(_skipped_key(name)) or 0)
+
+
+def _lock(name, lease, token=None):
+    lock = get_redis().lock(
+        _lock_key(name), timeout=lease, blocking=False, thread_local=False
+    )
+    lock.local.token = token
+    return lock
+
+
+def acquire_lease(name, lease=None):
+    """
+    Takes the lock ``name`` for ``lease`` seconds, unless it's already held.
+    Failed attempts are counted, see ``skipped_runs``.
+
+    Args:
+        name (str): The lock name.
+        lease (float): Seconds the lock is held for without renewal. Defaults to
+            ``TASK_LOCK_LEASE``.
+
+    Returns:
+        str: The token to renew and release the lock with, ``None`` if it's held
+        by someone else.
+    """
+    token = uuid.uuid4().hex
+    lease = lease or settings.TASK_LOCK_LEASE
+    if _lock(name, lease).acquire(token=token):
+        return token
+    skipped = get_redis().incr(_skipped_key(name))
+    logger.info("Skipped %s, already running (%d skipped).", name, skipped)
+    return None
+
+
+def renew_lease(name, token, lease=None):
+    """
+    Resets the lock ``name`` to expire in ``lease`` seconds, if still held with
+    ``token``.
+
+    Args:
+        name (str): The lock name.
+        token (str): The token returned by ``acquire_lease``.
+        lease (float): Defaults to ``TASK_LOCK_LEASE``.
+
+    Returns:
+        bool: False if the lock expired or is held by someone else.
+    """
+    lease = lease or settings.TASK_LOCK_LEASE
+    try:
+        return _lock(name, lease, token).extend(lease, replace_ttl=True)
+    except redis.exceptions.LockError:
+        logger.warning("Lost lock %s while renewing it.", name)
+        return False
+
+
+def release_lease(name, token):
+    """
+    Releases the lock ``name``, if still held with ``token``.
+
+    Args:
+        name (str): The lock name.
+        token (str): The token returned by ``acquire_lease``.
+
+    Returns:
+        bool: False if the lock had expired or was held by someone else.
+    """
+    try:
+        _lock(name, None, token).release()
+    except redis.exceptions.LockError:
+        logger.warning("Lock %s expired before release.", name)
+        return False
+    return True
+
+
+def _renew(name, token, lease, stopped):
+    # Extend the lease a third of the way through, so a missed renewal or two
+    # still leaves it held.
+    while not stopped.wait(lease / 3):
+        try:
+            if not renew_lease(name, token, lease):
+                return
+        except redis.exceptions.RedisError:
+            logger.exception("Failed to renew lock %s.", name)
+
+
+def single_flight(name=None, lease=None):
+    """
+    Decorator skipping a call while another call holds the same lock.
+
+    The lock is held for ``lease`` seconds and renewed every ``lease / 3``
+    seconds until the call returns, so it only outlives the call if the worker
+    dies. Skipped calls return ``None`` and are counted, see ``skipped_runs``.
+
+    Args:
+        name (str): The lock name. Defaults to the decorated function's module
+            and name.
+        lease (float): Seconds the lock is held for without renewal. Defaults to
+            ``TASK_LOCK_LEASE``.
+
+    Usage:
+        Place below ``@app.task`` so the lock wraps the task body::
+
+            @app.task
+            @single_flight()
+            def verify_pending_subreddits():
+                ...
+    """
+
+    def decorator(func):
+        lock_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            lock_lease = lease or settings.TASK_LOCK_LEASE
+            token = acquire_lease(lock_name, lock_lease)
+            if token is None:
+                return None
+
+            stopped = threading.Event()
+            renewer = threading.Thread(
+                target=_renew,
+                args=(lock_name, token, lock_lease, stopped),
+                name=f"renew-{lock_name}",
+                daemon=True,
+            )
+            renewer.start()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stopped.set()
+                renewer.join()
+                release_lease(lock_name, token)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,33 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from wagtail.fields import StreamField
+
+from tunerguy.base.page_cache import page_cache_stats
+from tunerguy.base.templatetags.stream_cache_tags import stream_cache_stats
+
+
+class Command(BaseCommand):
+    help = "Show the page cache and StreamField fragment cache counters."
+
+    def handle(self, *args, **options):
+        stats = page_cache_stats()
+        self.stdout.write(
+            f"Page cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_ratio']:.0%} hit ratio)"
+        )
+
+        field_names = sorted(
+            {
+                field.name
+                for model in apps.get_models()
+                for field in model._meta.get_fields()
+                if isinstance(field, StreamField)
+            }
+        )
+        self.stdout.write("StreamField fragments:")
+        for field_name, stats in stream_cache_stats(field_names).items():
+            self.stdout.write(
+                f"  {field_name}: {stats['hits']} hits, "
+                f"{stats['misses']} misses, "
+                f"{stats['saved_us'] / 1000:.1f}ms of rendering saved"
+            )
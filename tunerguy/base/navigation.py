@@ -0,0 +1,138 @@
+"""
+navigation module
+
+This module builds the site's navigation from the page tree, e.g. breadcrumbs,
+without loading each page or looking up its site.
+
+Page URLs are derived from ``url_path`` and the sites' root paths, which Wagtail
+keeps in the cache, rather than through ``Page.url`` one page at a time.
+Breadcrumbs are cached per page for ``NAVIGATION_CACHE_TIMEOUT`` seconds, and
+dropped when one of the page's ancestors is published or the page is moved.
+
+Module Functions:
+    - page_urls(url_paths): Returns the URLs of pages from their ``url_path``.
+    - breadcrumbs(page): Returns a page's ancestors with their URLs.
+    - invalidate_breadcrumbs(sender, instance, **kwargs): Signal handler
+      dropping the breadcrumbs of a page and its descendants.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from wagtail.models import Page, Site
+
+BREADCRUMBS_CACHE_KEY = "navigation:breadcrumbs:{}"
+
+
+def _page_url(url_path, root_paths):
+    # The root paths are sorted most specific first, as Page.get_url_parts
+    # expects.
+    for site_root_path in root_paths:
+        if url_path.startswith(site_root_path.root_path):
+            break
+    else:
+        return None
+
+    page_path = reverse(
+        "wagtail_serve",
+        args=(url_path[len(site_root_path.root_path) :],),
+    )
+    if (
+        not getattr(settings, "WAGTAIL_APPEND_SLASH", True)
+        and page_path != "/"
+    ):
+        page_path = page_path.rstrip("/")
+    if len(root_paths) == 1:
+        return page_path
+    return site_root_path.root_url + page_path
+
+
+def page_urls(url_paths):
+    """
+    Returns the URLs of pages from their ``url_path``, with a single cache read
+    for the whole batch.
+
+    Args:
+        url_paths (iterable): The pages' ``url_path``.
+
+    Returns:
+        dict: The URL of each url_path, as ``Page.url`` returns it: relative
+        if there's a single site, else including the site's root URL. ``None``
+        for pages outside of every site.
+    """
+    root_paths = Site.get_site_root_paths()
+    return {
+        url_path: _page_url(url_path, root_paths) for url_path in url_paths
+    }
+
+
+def _build_breadcrumbs(page):
+    # The ancestors' paths are the prefixes of the page's; the root's is left
+    # out.
+    paths = [
+        page.path[: Page.steplen * depth] for depth in range(2, page.depth)
+    ]
+    if not paths:
+        return []
+    ancestors = list(
+        Page.objects.filter(path__in=paths)
+        .order_by("path")
+        .values("pk", "title", "url_path")
+    )
+    urls = page_urls(ancestor["url_path"] for ancestor in ancestors)
+    return [
+        {
+            "id": ancestor["pk"],
+            "title": ancestor["title"],
+            "url": urls[ancestor["url_path"]],
+        }
+        for ancestor in ancestors
+    ]
+
+
+def breadcrumbs(page):
+    """
+    Returns the breadcrumbs of a page: its ancestors below the root, top down.
+
+    Built with a single query when not cached.
+
+    Args:
+        page (Page): The page.
+
+    Returns:
+        list: A dict per ancestor with its ``id``, ``title`` and ``url``.
+    """
+    # Previews of new pages have no id to cache them under.
+    if page.pk is None:
+        return _build_breadcrumbs(page)
+
+    key = BREADCRUMBS_CACHE_KEY.format(page.pk)
+    crumbs = cache.get(key)
+    if crumbs is None:
+        crumbs = _build_breadcrumbs(page)
+        cache.set(key, crumbs, settings.NAVIGATION_CACHE_TIMEOUT)
+    return crumbs
+
+
+def invalidate_breadcrumbs(sender, instance, **kwargs):
+    """
+    Drops the breadcrumbs of a published or moved page and of its descendants,
+    which show its title and URL.
+
+    Runs once the transaction commits, so they aren't cached again from the
+    data being replaced.
+    """
+    if not isinstance(instance, Page):
+        return
+    page_ids = [instance.pk]
+    if instance.numchild:
+        page_ids += Page.objects.descendant_of(instance).values_list(
+            "pk", flat=True
+        )
+
+    transaction.on_commit(
+        lambda: cache.delete_many(
+            [BREADCRUMBS_CACHE_KEY.format(page_id) for page_id in page_ids]
+        )
+    )
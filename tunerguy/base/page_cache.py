@@ -0,0 +1,392 @@
+"""
+page_cache module
+
+This module provides a full-response cache for Wagtail pages served to anonymous
+visitors.
+
+Page types opt in with ``CachedPageMixin``. Each page has a version number kept in
+the cache and part of its cache keys; bumping the version invalidates the page's
+cached responses, which are never served again and simply expire.
+
+While a page is rendered for the cache, everything it reads is recorded as a
+dependency: the page itself, objects chosen in its StreamFields (pages, images,
+snippets, and pages and images in their rich text) and whatever its
+``get_context`` declares with ``depends_on``, such as a ``RedditEmbed`` or the
+descendants it lists. A reverse index in the cache maps each dependency to the
+pages that read it, so a change invalidates exactly the pages that show it
+rather than the whole site.
+
+Module Classes:
+    - CachedPageMixin: Serves cached responses of a page type to anonymous users.
+
+Module Functions:
+    - dependency_key(dependency): Returns the key identifying a dependency.
+    - descendants_key(page): Returns the dependency key of a page's descendants.
+    - fragment_id(page, name): Returns the id versioning a fragment of a page.
+    - depends_on(*dependencies): Records dependencies of the page being rendered.
+    - stream_dependencies(value): Yields the objects chosen in a StreamField.
+    - rich_text_dependencies(source): Yields the pages and images rich text
+      links to.
+    - page_version(page_id): Returns the cache version of a page.
+    - bump_page_versions(page_ids): Invalidates the cached responses of pages.
+    - record_dependents(page_id, dependencies): Adds a page to the reverse
+      index of its dependencies.
+    - invalidate(*dependencies): Invalidates the pages that read the dependencies.
+    - invalidate_page(sender, instance, **kwargs): Signal handler invalidating a
+      changed page and the pages listing it.
+    - invalidate_object(sender, instance, **kwargs): Signal handler invalidating
+      the pages that read an object.
+    - page_cache_stats(): Returns the cache's hit and miss counters.
+"""
+
+import hashlib
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models, transaction
+from django.http import HttpResponse
+from wagtail.blocks import StreamValue, StructValue
+from wagtail.blocks.list_block import ListValue
+from wagtail.fields import StreamField
+from wagtail.images import get_image_model
+from wagtail.models import Page
+from wagtail.rich_text import RichText, rewriters
+
+VERSION_CACHE_KEY = "page_cache:version:{}"
+RESPONSE_CACHE_KEY = "page_cache:response:{}:{}:{}"
+DEPENDENTS_CACHE_KEY = "page_cache:dependents:{}:{}"
+STATS_CACHE_KEY = "page_cache:stats:{}"
+
+# The dependencies recorded by the page being rendered for the cache, if any.
+_dependencies = ContextVar("page_cache_dependencies", default=None)
+
+
+def dependency_key(dependency):
+    """
+    Returns the key identifying a dependency.
+
+    Args:
+        dependency: A model instance, or a key as returned by this function or
+            ``descendants_key``.
+
+    Returns:
+        str: e.g. "wagtailcore.page:3" or "blog.redditembed:1". Pages are
+        identified by their base ``Page`` whatever their type.
+    """
+    if isinstance(dependency, str):
+        return dependency
+    if isinstance(dependency, Page):
+        return f"wagtailcore.page:{dependency.pk}"
+    return f"{dependency._meta.label_lower}:{dependency.pk}"
+
+
+def descendants_key(page):
+    """
+    Returns the dependency key of a page's descendants, read by pages listing
+    them. It changes whenever a descendant is published, unpublished or deleted.
+
+    Args:
+        page (Page or int): The page or its id.
+    """
+    return f"descendants:{getattr(page, 'pk', page)}"
+
+
+def fragment_id(page, name):
+    """
+    Returns the id versioning a fragment of a page on its own, e.g. the HTML of
+    one of its StreamFields. Used in place of a page id, only the dependencies
+    recorded for the fragment bump its version, not the page's others.
+
+    Args:
+        page (Page or int): The page or its id.
+        name (str): The name of the fragment, e.g. the field's.
+    """
+    return f"{getattr(page, 'pk', page)}:{name}"
+
+
+def depends_on(*dependencies):
+    """
+    Records dependencies of the page being rendered for the cache. Does nothing
+    outside of a cached render.
+
+    Args:
+        *dependencies: Model instances or dependency keys, ``None`` is ignored.
+    """
+    recorded = _dependencies.get()
+    if recorded is not None:
+        recorded.update(
+            dependency_key(dependency)
+            for dependency in dependencies
+            if dependency is not None
+        )
+
+
+def stream_dependencies(value):
+    """
+    Yields the model instances chosen in a StreamField value, e.g. images,
+    pages and snippets, at any depth. Pages linked and images embedded in rich
+    text are yielded as their dependency keys, read from its stored source.
+
+    Args:
+        value: A StreamField value or one of its block values.
+    """
+    if isinstance(value, models.Model):
+        yield value
+    elif isinstance(value, RichText):
+        yield from rich_text_dependencies(value.source)
+    elif isinstance(value, StreamValue):
+        for child in value:
+            yield from stream_dependencies(child.value)
+    elif isinstance(value, StructValue):
+        for child in value.values():
+            yield from stream_dependencies(child)
+    elif isinstance(value, (ListValue, list)):
+        for child in value:
+            yield from stream_dependencies(child)
+
+
+def rich_text_dependencies(source):
+    """
+    Yields the dependency keys of the pages linked and images embedded in rich
+    text, e.g. ``<a linktype="page" id="3">``.
+
+    Args:
+        source (str): Rich text in Wagtail's stored format.
+    """
+    for tag in rewriters.FIND_A_TAG.findall(source):
+        attrs = rewriters.extract_attrs(tag)
+        if attrs.get("linktype") == "page" and attrs.get("id"):
+            yield f"wagtailcore.page:{attrs['id']}"
+    image_label = get_image_model()._meta.label_lower
+    for tag in rewriters.FIND_EMBED_TAG.findall(source):
+        attrs = rewriters.extract_attrs(tag)
+        if attrs.get("embedtype") == "image" and attrs.get("id"):
+            yield f"{image_label}:{attrs['id']}"
+
+
+def page_version(page_id):
+    """
+    Returns the cache version of a page, or of a fragment by its
+    ``fragment_id``, 0 if it was never bumped.
+    """
+    return cache.get(VERSION_CACHE_KEY.format(page_id), 0)
+
+
+def bump_page_versions(page_ids):
+    """
+    Invalidates the cached responses of pages by bumping their versions.
+
+    Args:
+        page_ids (iterable): Ids of the pages, or ``fragment_id`` of the
+            fragments, to invalidate.
+    """
+    for page_id in page_ids:
+        key = VERSION_CACHE_KEY.format(page_id)
+        # Versions outlive the responses they key, so an expired version can't
+        # come back as an old number with responses still cached under it.
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def record_dependents(page_id, dependencies):
+    """
+    Adds a page to the reverse index of the dependencies it was rendered from.
+
+    A dependency's index is a list of slots numbered by an atomic counter, so
+    concurrent renders never drop each other's entries. A marker per page and
+    dependency, added atomically, keeps a page from taking a slot per render.
+    Entries are kept until the dependency is invalidated, like page versions.
+
+    Args:
+        page_id (int or str): Id of the page whose version keys the cached
+            content, or the ``fragment_id`` of a fragment versioned on its own.
+        dependencies (iterable): Model instances or dependency keys.
+    """
+    for dependency in map(dependency_key, dependencies):
+        marker_key = DEPENDENTS_CACHE_KEY.format(dependency, f"page:{page_id}")
+        if not cache.add(marker_key, True, timeout=None):
+            continue
+        count_key = DEPENDENTS_CACHE_KEY.format(dependency, "count")
+        cache.add(count_key, 0, timeout=None)
+        slot = cache.incr(count_key)
+        cache.set(
+            DEPENDENTS_CACHE_KEY.format(dependency, slot),
+            page_id,
+            timeout=None,
+        )
+        # An invalidation that claimed the slot may have read it before it was
+        # set, so the page is invalidated here instead.
+        start_key = DEPENDENTS_CACHE_KEY.format(dependency, "start")
+        if cache.get(start_key, 0) >= slot:
+            bump_page_versions([page_id])
+            cache.delete(marker_key)
+
+
+def invalidate(*dependencies):
+    """
+    Invalidates the cached responses of the pages that read any of the
+    dependencies.
+
+    Args:
+        *dependencies: Model instances or dependency keys.
+
+    Returns:
+        set: Ids of the invalidated pages and fragments.
+    """
+    dependencies = [dependency_key(dependency) for dependency in dependencies]
+    bounds = cache.get_many(
+        [
+            DEPENDENTS_CACHE_KEY.format(dependency, bound)
+            for dependency in dependencies
+            for bound in ("start", "count")
+        ]
+    )
+    slots, starts = {}, {}
+    for dependency in dependencies:
+        start_key = DEPENDENTS_CACHE_KEY.format(dependency, "start")
+        start = bounds.get(start_key, 0)
+        count = bounds.get(DEPENDENTS_CACHE_KEY.format(dependency, "count"), 0)
+        for slot in range(start + 1, count + 1):
+            slots[DEPENDENTS_CACHE_KEY.format(dependency, slot)] = dependency
+        starts[start_key] = count
+    # Slots are claimed before they're read, see ``record_dependents``. Slots
+    # taken since are left to the next invalidation, and a concurrent one
+    # moving the start back only makes it read emptied slots again.
+    cache.set_many(starts, timeout=None)
+    found = cache.get_many(slots)
+    page_ids = set(found.values())
+    bump_page_versions(page_ids)
+    cache.delete_many(
+        [
+            *found,
+            *(
+                DEPENDENTS_CACHE_KEY.format(slots[key], f"page:{page_id}")
+                for key, page_id in found.items()
+            ),
+        ]
+    )
+    return page_ids
+
+
+def invalidate_page(sender, instance, **kwargs):
+    """
+    Invalidates a published, unpublished or deleted page, the pages that read it
+    and the pages listing the descendants of its ancestors.
+
+    Runs once the transaction commits, so pages aren't re-rendered and cached
+    again from the data being replaced.
+    """
+    if not isinstance(instance, Page):
+        return
+    ancestor_ids = list(instance.get_ancestors().values_list("pk", flat=True))
+
+    def invalidate_after_commit():
+        bump_page_versions([instance.pk])
+        invalidate(
+            instance,
+            *[descendants_key(ancestor_id) for ancestor_id in ancestor_ids],
+        )
+
+    transaction.on_commit(invalidate_after_commit)
+
+
+def invalidate_object(sender, instance, **kwargs):
+    """Invalidates the pages that read a saved or deleted object."""
+    transaction.on_commit(lambda: invalidate(instance))
+
+
+def _count(stat):
+    key = STATS_CACHE_KEY.format(stat)
+    cache.add(key, 0, timeout=None)
+    cache.incr(key)
+
+
+def page_cache_stats():
+    """
+    Returns the page cache's hit and miss counters, shared by every process.
+
+    Returns:
+        dict: ``hits``, ``misses`` and ``hit_ratio``.
+    """
+    stats = cache.get_many(
+        [STATS_CACHE_KEY.format(s) for s in ("hit", "miss")]
+    )
+    hits = stats.get(STATS_CACHE_KEY.format("hit"), 0)
+    misses = stats.get(STATS_CACHE_KEY.format("miss"), 0)
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / (hits + misses), 2) if hits + misses else 0,
+    }
+
+
+class CachedPageMixin:
+    """
+    Serves cached responses of a page type to anonymous users.
+
+    Only successful GET and HEAD requests from anonymous users are cached, for
+    ``PAGE_CACHE_TIMEOUT`` seconds, keyed by the page's version and the full
+    path including the query string. Previews and logged in editors always get
+    a freshly rendered page. The dependencies read while rendering are
+    recorded, see ``depends_on``. Responses carry an ``X-Page-Cache`` header saying
+    whether they were a hit or a miss.
+
+    Usage:
+        List before the ``Page`` base class::
+
+            class CategoryPage(CachedPageMixin, BaseCategory):
+                ...
+    """
+
+    def is_cacheable_request(self, request):
+        return (
+            settings.PAGE_CACHE_ENABLED
+            and request.method in ("GET", "HEAD")
+            and not getattr(request, "is_preview", False)
+            and not request.user.is_authenticated
+        )
+
+    def page_cache_key(self, request):
+        path = hashlib.sha1(request.get_full_path().encode()).hexdigest()
+        return RESPONSE_CACHE_KEY.format(self.pk, page_version(self.pk), path)
+
+    def serve(self, request, *args, **kwargs):
+        if not self.is_cacheable_request(request):
+            return super().serve(request, *args, **kwargs)
+
+        key = self.page_cache_key(request)
+        cached = cache.get(key)
+        if cached is not None:
+            _count("hit")
+            response = HttpResponse(
+                cached["content"], content_type=cached["content_type"]
+            )
+            response["X-Page-Cache"] = "hit"
+            return response
+
+        _count("miss")
+        dependencies = {dependency_key(self)}
+        token = _dependencies.set(dependencies)
+        try:
+            for field in self._meta.get_fields():
+                if isinstance(field, StreamField):
+                    depends_on(*stream_dependencies(getattr(self, field.name)))
+            response = super().serve(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        finally:
+            _dependencies.reset(token)
+        # Responses setting cookies are specific to the visitor.
+        if response.status_code == 200 and not response.cookies:
+            cache.set(
+                key,
+                {
+                    "content": response.content,
+                    "content_type": response["Content-Type"],
+                },
+                settings.PAGE_CACHE_TIMEOUT,
+            )
+            record_dependents(self.pk, dependencies)
+        response["X-Page-Cache"] = "miss"
+        return response
@@ -0,0 +1,249 @@
+"""
+rate_limit module
+
+This module provides a token bucket used to pace requests to rate limited APIs.
+
+Module Classes:
+    - TokenBucket: Thread-safe token bucket that can be synced with the remaining
+      quota reported by an API.
+    - SharedTokenBucket: ``TokenBucket`` kept in Redis, shared by every process
+      spending the same quota.
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``; each
+    request consumes one, waiting for it to refill when the bucket is empty.
+
+    The bucket can be synced with the quota an API reports in its responses: the
+    tokens are capped at the requests remaining and the refill rate is slowed so
+    the remaining requests last until the quota window resets.
+
+    Attributes:
+        capacity (float): Maximum number of tokens, i.e. the allowed burst.
+        rate (float): Tokens refilled per second.
+        tokens (float): Tokens currently available.
+        waited (float): Total seconds spent waiting for tokens.
+
+    Methods:
+        - acquire(): Consumes a token, waiting for one if needed.
+        - sync(remaining, reset): Applies the quota reported by the API.
+        - stats(): Returns the bucket's state.
+
+    Usage:
+        ``clock`` and ``sleep`` default to ``time.monotonic`` and ``time.sleep``
+        and can be replaced with fakes to drive the bucket in tests.
+    """
+
+    def __init__(self, capacity, rate, clock=time.monotonic, sleep=time.sleep):
+        self.capacity = capacity
+        self.rate = self._base_rate = rate
+        self.tokens = capacity
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._reset_at = None
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        if self._reset_at is not None and now >= self._reset_at:
+            # The API's quota window reset, go back to the configured rate.
+            self.rate = self._base_rate
+            self._reset_at = None
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self):
+        """
+        Consumes a token, waiting for one to refill if the bucket is empty.
+
+        Returns:
+            float: Seconds waited.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.waited += wait
+
+        if wait:
+            self._sleep(wait)
+        return wait
+
+    def sync(self, remaining, reset):
+        """
+        Applies the quota reported by the API.
+
+        Args:
+            remaining (float): Requests left in the current quota window.
+            reset (float): Seconds until the quota window resets.
+        """
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, remaining)
+            reset = max(reset, 1)
+            self.rate = min(self._base_rate, max(remaining, 1) / reset)
+            self._reset_at = self._clock() + reset
+
+    def stats(self):
+        """
+        Returns the bucket's state.
+
+        Returns:
+            dict: ``tokens`` available, refill ``rate`` and total seconds ``waited``.
+        """
+        with self._lock:
+            self._refill()
+            return {
+                "tokens": round(self.tokens, 2),
+                "rate": round(self.rate, 4),
+                "waited": round(self.waited, 3),
+            }
+
+
+# Refills and applies one operation to a bucket stored in a Redis hash, see
+# ``TokenBucket`` for the arithmetic. Floats are passed around as strings, Redis
+# truncates Lua numbers to integers.
+SHARED_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local base_rate = tonumber(ARGV[3])
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated", "rate", "reset_at")
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+local rate = tonumber(state[3]) or base_rate
+local reset_at = tonumber(state[4])
+if reset_at and now >= reset_at then
+    rate = base_rate
+    reset_at = nil
+end
+-- Clocks of different hosts may disagree, never refill backwards.
+tokens = math.min(capacity, tokens + math.max(now - updated, 0) * rate)
+updated = math.max(now, updated)
+local wait = 0
+if ARGV[4] == "acquire" then
+    tokens = tokens - 1
+    if tokens < 0 then
+        wait = -tokens / rate
+    end
+elseif ARGV[4] == "sync" then
+    local remaining = tonumber(ARGV[6])
+    local reset = math.max(tonumber(ARGV[7]), 1)
+    tokens = math.min(tokens, remaining)
+    rate = math.min(base_rate, math.max(remaining, 1) / reset)
+    reset_at = now + reset
+end
+redis.call(
+    "HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(updated),
+    "rate", tostring(rate), "reset_at", tostring(reset_at or "")
+)
+redis.call("EXPIRE", KEYS[1], ARGV[5])
+return {tostring(tokens), tostring(rate), tostring(wait)}
+"""
+
+
+class SharedTokenBucket:
+    """
+    Token bucket kept in Redis, shared by every process spending the same quota,
+    e.g. the Celery workers fetching from one Reddit client in parallel.
+
+    Behaves like ``TokenBucket``, but the tokens, refill rate and quota window
+    live in a Redis hash that each call refills and updates atomically, so the
+    processes together stay within ``rate`` and the quota the API reports.
+
+    Attributes:
+        key (str): The Redis key of the bucket's state.
+        capacity (float): Maximum number of tokens, i.e. the allowed burst.
+        rate (float): Tokens refilled per second, unless synced lower.
+        waited (float): Total seconds this process spent waiting for tokens.
+
+    Methods:
+        - acquire(): Consumes a token, waiting for one if needed.
+        - sync(remaining, reset): Applies the quota reported by the API.
+        - stats(): Returns the bucket's state.
+
+    Usage:
+        ``clock`` defaults to ``time.time``, comparable across hosts, and
+        ``sleep`` to ``time.sleep``. Both can be replaced with fakes to drive the
+        bucket in tests.
+    """
+
+    # Seconds an idle bucket is kept, long after it would have refilled.
+    TTL = 60 * 60
+
+    def __init__(
+        self, redis, name, capacity, rate, clock=time.time, sleep=time.sleep
+    ):
+        self.key = f"rate_limit:{name}"
+        self.capacity = capacity
+        self.rate = rate
+        self.waited = 0.0
+        self._clock = clock
+        self._sleep = sleep
+        self._script = redis.register_script(SHARED_BUCKET_SCRIPT)
+        self._lock = threading.Lock()
+
+    def _call(self, operation, *args):
+        tokens, rate, wait = self._script(
+            keys=[self.key],
+            args=[
+                repr(self._clock()),
+                repr(float(self.capacity)),
+                repr(float(self.rate)),
+                operation,
+                self.TTL,
+                *(repr(float(arg)) for arg in args),
+            ],
+        )
+        return float(tokens), float(rate), float(wait)
+
+    def acquire(self):
+        """
+        Consumes a token, waiting for one to refill if the bucket is empty.
+
+        Returns:
+            float: Seconds waited.
+        """
+        _, _, wait = self._call("acquire")
+        if wait:
+            with self._lock:
+                self.waited += wait
+            self._sleep(wait)
+        return wait
+
+    def sync(self, remaining, reset):
+        """
+        Applies the quota reported by the API.
+
+        Args:
+            remaining (float): Requests left in the current quota window.
+            reset (float): Seconds until the quota window resets.
+        """
+        self._call("sync", remaining, reset)
+
+    def stats(self):
+        """
+        Returns the bucket's state.
+
+        Returns:
+            dict: ``tokens`` available, refill ``rate`` and total seconds this
+            process ``waited``.
+        """
+        tokens, rate, _ = self._call("stats")
+        with self._lock:
+            waited = self.waited
+        return {
+            "tokens": round(tokens, 2),
+            "rate": round(rate, 4),
+            "waited": round(waited, 3),
+        }
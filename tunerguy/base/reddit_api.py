@@ -4,35 +4,399 @@ reddit_utils module
 This module provides utility functions to interact with the Reddit API and retrieve
 information about Reddit posts and subreddits.
 
+A single ``praw.Reddit`` client is shared by each process (web worker or Celery
+worker). The client keeps its HTTP connection pool and OAuth token between calls;
+PRAW refreshes the token transparently once it expires. The client is discarded in
+forked children so a pre-loaded client is never shared across processes. PRAW and
+prawcore aren't thread-safe, so threads take turns using it through
+``reddit_client``; otherwise each would request its own OAuth token.
+
+Every request to Reddit first takes a token from a ``SharedTokenBucket`` kept in
+Redis, so the processes fetching in parallel, e.g. the chunks of a refresh, share
+one budget. It is synced with the ``x-ratelimit-*`` headers Reddit returns so a
+burst of refreshes can't exhaust the client's quota.
+
+Fetching posts goes through a ``CircuitBreaker`` per subreddit: after repeated
+failures the subreddit isn't called again until an exponential backoff has
+passed, and callers keep serving the posts they already have.
+
 Module Functions:
-    - authenticate(): Authenticates and returns a Reddit instance.
+    - authenticate(): Authenticates and returns a new Reddit instance.
+    - get_client(): Returns the process-wide Reddit instance, creating it if needed.
+    - reddit_client(): Lends the process-wide Reddit instance to the calling thread.
+    - reset_client(): Discards the process-wide Reddit instance and rate limiter.
+    - use_requestor(requestor_class, **requestor_kwargs): Swaps the HTTP transport.
+    - get_rate_limiter(): Returns the ``SharedTokenBucket`` pacing requests.
+    - client_stats(): Returns counters for the process-wide Reddit instance.
+    - normalize_subreddit(subreddit): Returns the canonical form of a subreddit name.
+    - get_moderators(subreddit): Returns the cached set of a subreddit's moderators.
+    - invalidate_moderators(subreddit): Drops the cached moderators of a subreddit.
+    - subreddit_breaker(subreddit): Returns the circuit breaker of a subreddit.
+    - breaker_states(subreddits): Returns the circuit breaker states of subreddits.
     - get_reddit_posts(subreddit): Retrieves the top Reddit posts from the specified subreddit.
-    - create_embed_code(submission): Creates an embed code for a Reddit submission.
-    - subreddit_found(subreddit): Checks if a subreddit exists.
+    - serialize_submission(submission): Returns the stored fields of a Reddit submission.
+    - store_thumbnails(posts): Saves the posts' thumbnails to the default storage.
+    - subreddit_found(subreddit): Checks if a subreddit exists and caches the answer.
+    - cached_subreddit_found(subreddit): Returns the cached answer of ``subreddit_found``.
+    - subreddit_exists(subreddit): ``subreddit_found`` with caching and a hard timeout.
 """
 
 import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
 import praw
-from prawcore.exceptions import NotFound
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from praw.exceptions import PRAWException
+from prawcore import Requestor
+from prawcore.exceptions import NotFound, PrawcoreException
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .circuit_breaker import CircuitBreaker
+from .locks import get_redis
+from .rate_limit import SharedTokenBucket
+
+TOKEN_PATH = "/api/v1/access_token"
+MODERATORS_CACHE_KEY = "reddit:moderators:{}"
+SUBREDDIT_FOUND_CACHE_KEY = "reddit:found:{}"
+THUMBNAIL_DIR = "reddit/thumbnails"
+# Only raster images are stored: SVG or HTML served from the site's own
+# domain could run scripts. Each type is checked against its file signature.
+THUMBNAIL_TYPES = {
+    "image/jpeg": (".jpg", (b"\xff\xd8\xff",)),
+    "image/png": (".png", (b"\x89PNG\r\n\x1a\n",)),
+    "image/gif": (".gif", (b"GIF87a", b"GIF89a")),
+    "image/webp": (".webp", (b"RIFF",)),
+}
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+_request_lock = threading.RLock()
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+_lookup_executor = None
+_rate_limiter = None
+_requestor = None
+
+
+def _increment(stat, amount=1):
+    with _stats_lock:
+        _stats[stat] += amount
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _increment("connections_opened")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _increment("connections_opened")
+        return super()._new_conn()
+
+
+class _CountingAdapter(HTTPAdapter):
+    """``HTTPAdapter`` that counts every new connection opened by its pools."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+
+class PooledRequestor(Requestor):
+    """
+    prawcore ``Requestor`` backed by a connection-counting ``requests.Session``.
+
+    Counts OAuth token grants so token reuse can be verified with ``client_stats``.
+    API requests are paced by the rate limiter, which is synced with the quota
+    reported in each response.
+    """
+
+    def __init__(self, *args, session=None, **kwargs):
+        if session is None:
+            session = requests.Session()
+            adapter = _CountingAdapter()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        super().__init__(*args, session=session, **kwargs)
+
+    def request(self, *args, **kwargs):
+        url = args[1] if len(args) > 1 else kwargs.get("url", "")
+        if url.endswith(TOKEN_PATH):
+            _increment("token_grants")
+            return super().request(*args, **kwargs)
+
+        rate_limiter = get_rate_limiter()
+        rate_limiter.acquire()
+        response = super().request(*args, **kwargs)
+        if "x-ratelimit-remaining" in response.headers:
+            rate_limiter.sync(
+                float(response.headers["x-ratelimit-remaining"]),
+                float(response.headers["x-ratelimit-reset"]),
+            )
+        return response
 
 
 def authenticate():
     """
-    Authenticates and returns a Reddit instance.
+    Authenticates and returns a new Reddit instance.
+
+    Prefer ``get_client`` which reuses the process-wide instance.
 
     Returns:
         praw.Reddit: Authenticated Reddit instance using the provided credentials.
     """
+    _increment("clients_created")
     return praw.Reddit(
         client_id=os.environ.get("REDDIT_ID"),
         client_secret=os.environ.get("REDDIT_SECRET"),
         user_agent=os.environ.get("REDDIT_USER_AGENT"),
         username=os.environ.get("REDDIT_USER"),
         password=os.environ.get("REDDIT_USER_PW"),
+        requestor_class=_requestor[0] if _requestor else PooledRequestor,
+        requestor_kwargs=_requestor[1] if _requestor else None,
     )
 
 
+def get_client():
+    """
+    Returns the process-wide Reddit instance, creating it on first use.
+
+    The instance is recreated when the current process is not the one that created
+    it, e.g. a gunicorn worker forked from a pre-loaded master. Use it through
+    ``reddit_client`` when other threads may be using it too.
+
+    Returns:
+        praw.Reddit: The shared Reddit instance.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _client_lock:
+            if _client is None or _client_pid != pid:
+                _client = authenticate()
+                _client_pid = pid
+    return _client
+
+
+@contextmanager
+def reddit_client():
+    """
+    Lends the process-wide Reddit instance to the calling thread.
+
+    Threads wait for each other, so the instance's token refresh and requests,
+    including lazy listings iterated in the ``with`` block, never run at once.
+    Nested use by the same thread doesn't wait.
+
+    Yields:
+        praw.Reddit: The shared Reddit instance.
+
+    Usage:
+        ``with reddit_client() as reddit: reddit.subreddit("gti").moderator()``
+    """
+    with _request_lock:
+        yield get_client()
+
+
+def reset_client():
+    """
+    Discards the process-wide Reddit instance and rate limiter.
+
+    The instance's connections aren't closed, they may belong to a parent process.
+    """
+    global _client, _client_pid, _rate_limiter
+
+    with _client_lock:
+        _client = None
+        _client_pid = None
+        _rate_limiter = None
+
+
+def use_requestor(requestor_class=None, **requestor_kwargs):
+    """
+    Swaps the HTTP transport of the process-wide Reddit instance.
+
+    Used to run against recorded or synthetic responses, see ``reddit_replay``.
+    Call without arguments to go back to ``PooledRequestor``.
+
+    Args:
+        requestor_class (type): A ``PooledRequestor`` subclass.
+        **requestor_kwargs: Keyword arguments for ``requestor_class``.
+    """
+    global _requestor
+
+    _requestor = (
+        (requestor_class, requestor_kwargs) if requestor_class else None
+    )
+    reset_client()
+
+
+def get_rate_limiter():
+    """
+    Returns the ``SharedTokenBucket`` pacing requests to Reddit.
+
+    It allows bursts of ``REDDIT_RATE_LIMIT_BURST`` requests and refills at
+    ``REDDIT_RATE_LIMIT_PER_MINUTE`` requests per minute, across every process.
+
+    Returns:
+        SharedTokenBucket: This process' handle on the shared rate limiter.
+    """
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        with _client_lock:
+            if _rate_limiter is None:
+                _rate_limiter = SharedTokenBucket(
+                    get_redis(),
+                    # Replayed requests don't spend Reddit's quota.
+                    "reddit:replay" if _requestor else "reddit",
+                    capacity=settings.REDDIT_RATE_LIMIT_BURST,
+                    rate=settings.REDDIT_RATE_LIMIT_PER_MINUTE / 60,
+                )
+    return _rate_limiter
+
+
+def _reset_after_fork():
+    global _client_lock, _request_lock, _stats_lock, _lookup_executor
+
+    # Locks may have been held by another thread at fork time, and the
+    # lookup executor's threads do not survive the fork.
+    _client_lock = threading.Lock()
+    _request_lock = threading.RLock()
+    _stats_lock = threading.Lock()
+    _lookup_executor = None
+    reset_client()
+    _stats.clear()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def client_stats():
+    """
+    Returns counters for the Reddit instances of this process.
+
+    Returns:
+        dict: ``clients_created``, ``token_grants``, ``connections_opened`` and the
+        rate limiter's ``rate_limit`` stats, including the remaining budget.
+    """
+    with _stats_lock:
+        stats = {
+            "clients_created": _stats["clients_created"],
+            "token_grants": _stats["token_grants"],
+            "connections_opened": _stats["connections_opened"],
+        }
+    stats["rate_limit"] = get_rate_limiter().stats()
+    return stats
+
+
+def normalize_subreddit(subreddit):
+    """
+    Returns the canonical form of a subreddit name.
+
+    Subreddit names are case-insensitive, "FiestaST" and "fiestast" are the same
+    community and only need to be fetched once.
+
+    Args:
+        subreddit (str): The name of the subreddit.
+
+    Returns:
+        str: The lowercased name, stripped of surrounding whitespace.
+    """
+    return subreddit.strip().lower()
+
+
+def get_moderators(subreddit):
+    """
+    Returns the set of a subreddit's moderators.
+
+    Moderator lists rarely change, so they are kept in the Django cache for
+    ``REDDIT_MODERATORS_CACHE_TTL`` seconds rather than fetched on every refresh.
+
+    Args:
+        subreddit (str): The name of the subreddit.
+
+    Returns:
+        set: Lowercased usernames of the subreddit's moderators.
+    """
+    key = MODERATORS_CACHE_KEY.format(normalize_subreddit(subreddit))
+    moderators = cache.get(key)
+    if moderators is None:
+        with reddit_client() as reddit:
+            moderators = {
+                mod.name.lower()
+                for mod in reddit.subreddit(subreddit).moderator()
+            }
+        cache.set(key, moderators, settings.REDDIT_MODERATORS_CACHE_TTL)
+    return moderators
+
+
+def invalidate_moderators(subreddit):
+    """
+    Drops the cached moderators of a subreddit.
+
+    Args:
+        subreddit (str): The name of the subreddit.
+    """
+    cache.delete(MODERATORS_CACHE_KEY.format(normalize_subreddit(subreddit)))
+
+
+def subreddit_breaker(subreddit):
+    """
+    Returns the circuit breaker guarding requests for a subreddit's posts.
+
+    It opens after ``REDDIT_BREAKER_THRESHOLD`` consecutive failures, for
+    ``REDDIT_BREAKER_BACKOFF`` seconds doubling on every further failure up to
+    ``REDDIT_BREAKER_MAX_BACKOFF``.
+
+    Args:
+        subreddit (str): The name of the subreddit.
+
+    Returns:
+        CircuitBreaker: The subreddit's breaker.
+    """
+    return CircuitBreaker(
+        f"reddit:{normalize_subreddit(subreddit)}",
+        threshold=settings.REDDIT_BREAKER_THRESHOLD,
+        backoff=settings.REDDIT_BREAKER_BACKOFF,
+        max_backoff=settings.REDDIT_BREAKER_MAX_BACKOFF,
+    )
+
+
+def breaker_states(subreddits):
+    """
+    Returns the circuit breaker states of subreddits, see ``CircuitBreaker.state``.
+
+    Args:
+        subreddits (list): Names of subreddits.
+
+    Returns:
+        dict: Breaker state keyed by normalized subreddit name.
+    """
+    subreddits = sorted({normalize_subreddit(s) for s in subreddits})
+    states = CircuitBreaker.states(
+        [subreddit_breaker(subreddit) for subreddit in subreddits]
+    )
+    return dict(zip(subreddits, states))
+
+
 def get_reddit_posts(subreddit):
     """
     Retrieves the top Reddit posts from the specified subreddit.
@@ -40,43 +404,128 @@ def get_reddit_posts(subreddit):
     Args:
         subreddit (str): The name of the subreddit.
 
+    Raises:
+        CircuitOpenError: The subreddit failed repeatedly and is backing off.
+
     Returns:
-        list: A list of embed codes for the top Reddit posts.
+        list: The fields of up to ``REDDIT_POST_POOL_SIZE`` top Reddit posts,
+        ranked as listed by Reddit, see ``serialize_submission``.
     """
-    reddit = authenticate()
-    subreddit = reddit.subreddit(subreddit)
+    breaker = subreddit_breaker(subreddit)
+    breaker.check()
+    try:
+        top_posts = _fetch_top_posts(subreddit)
+    except (PrawcoreException, PRAWException) as exc:
+        breaker.record_failure(exc)
+        raise
+    breaker.record_success()
+    return top_posts
+
+
+def _fetch_top_posts(subreddit):
+    moderators = get_moderators(subreddit)
 
-    moderators = [mod.name for mod in subreddit.moderator()]
+    fetched_at = datetime.now(timezone.utc).isoformat()
 
     top_posts = []
-    for submission in subreddit.hot(limit=10):
-        # Exclude posts from moderators to avoid pinned posts,
-        # announcements, etc. Exlude posts that contain the
-        # character the list will be joined and split on, "|".
-        if submission.author not in moderators and "|" not in submission.title:
-            embed_code = create_embed_code(submission)
-            top_posts.append(embed_code)
-            if len(top_posts) == 2:
-                break
+    with reddit_client() as reddit:
+        submissions = reddit.subreddit(subreddit).hot(
+            limit=settings.REDDIT_POST_POOL_SIZE
+        )
+        for submission in submissions:
+            # Exclude posts from moderators to avoid pinned posts,
+            # announcements, etc.
+            author = (
+                submission.author.name.lower() if submission.author else None
+            )
+            if author not in moderators:
+                top_posts.append(serialize_submission(submission, fetched_at))
 
     return top_posts
 
 
-def create_embed_code(submission):
+def serialize_submission(submission, fetched_at):
     """
-    Creates an embed code for a Reddit submission.
+    Returns the fields of a Reddit submission stored by ``RedditEmbed``.
 
     Args:
         submission (praw.models.Submission): The Reddit submission object.
+        fetched_at (str): ISO 8601 time the submission was fetched at.
 
     Returns:
-        str: The embed code for the Reddit submission.
+        dict: JSON serializable post id, title, author, permalink, score,
+        subreddit, thumbnail URL (or None) and fetch time.
+    """
+    # Posts without a preview have a placeholder, e.g. "self" or "nsfw".
+    thumbnail = submission.thumbnail
+    return {
+        "id": submission.id,
+        "title": submission.title,
+        "author": submission.author.name if submission.author else "[deleted]",
+        "permalink": submission.permalink,
+        "score": submission.score,
+        "subreddit": submission.subreddit.display_name,
+        "thumbnail": thumbnail if thumbnail.startswith("https://") else None,
+        "fetched_at": fetched_at,
+    }
+
+
+def store_thumbnails(posts):
     """
-    return (
-        f'<blockquote class="reddit-card" style="height:316px" data-embed-height="316">'
-        f'<a href="https://www.reddit.com{submission.permalink}">{submission.title}</a><br> by'
-        f'<a href="https://www.reddit.com/user/{submission.author}">u/{submission.author}</a> in '
-        f'<a href="https://www.reddit.com{submission.subreddit.url}">{submission.subreddit}</a></blockquote>'
+    Saves the posts' thumbnails to the default storage, so cards can be rendered
+    without loading images from Reddit.
+
+    Thumbnails are stored once per post. Each post with a thumbnail gets a
+    ``thumbnail_url`` to its stored copy; a thumbnail that can't be downloaded
+    is skipped and retried on the next refresh, which stores it with the posts,
+    see ``RedditEmbed.set_posts``. Only the ``THUMBNAIL_TYPES`` are stored,
+    named after their Content-Type rather than the URL.
+
+    Args:
+        posts (list): Posts as returned by ``get_reddit_posts``, updated in place.
+    """
+    for post in posts:
+        if not post.get("thumbnail"):
+            continue
+        name = _stored_thumbnail(post["id"]) or _download_thumbnail(
+            post["thumbnail"], post["id"]
+        )
+        if name:
+            post["thumbnail_url"] = default_storage.url(name)
+
+
+def _stored_thumbnail(post_id):
+    for extension, _ in THUMBNAIL_TYPES.values():
+        name = f"{THUMBNAIL_DIR}/{post_id}{extension}"
+        if default_storage.exists(name):
+            return name
+    return None
+
+
+def _download_thumbnail(url, post_id):
+    try:
+        response = requests.get(
+            url, timeout=settings.REDDIT_THUMBNAIL_TIMEOUT, stream=True
+        )
+        response.raise_for_status()
+        content = response.raw.read(
+            settings.REDDIT_THUMBNAIL_MAX_BYTES + 1, decode_content=True
+        )
+    except requests.RequestException:
+        return None
+    content_type = response.headers.get("Content-Type", "")
+    content_type = content_type.split(";")[0].strip().lower()
+    if content_type not in THUMBNAIL_TYPES:
+        return None
+    extension, signatures = THUMBNAIL_TYPES[content_type]
+    if not content.startswith(signatures):
+        return None
+    if content_type == "image/webp" and content[8:12] != b"WEBP":
+        return None
+    if len(content) > settings.REDDIT_THUMBNAIL_MAX_BYTES:
+        return None
+    return default_storage.save(
+        f"{THUMBNAIL_DIR}/{post_id}{extension}", ContentFile(content)
     )
 
 
@@ -87,15 +536,76 @@ def subreddit_found(subreddit):
     praw raises 404 when a subreddit isn't found.
     See: https://github.com/reddit-archive/reddit/blob/master/r2/r2/controllers/api.py#L4587
 
+    The answer is cached for ``REDDIT_FOUND_CACHE_TTL`` seconds when the
+    subreddit exists and ``REDDIT_NOT_FOUND_CACHE_TTL`` seconds when it doesn't.
+
     Args:
         subreddit (str): The name of the subreddit.
 
     Returns:
         bool: True if the subreddit exists, False otherwise.
     """
-    reddit = authenticate()
     try:
-        reddit.subreddits.search_by_name(subreddit, exact=True)
-        return True
+        with reddit_client() as reddit:
+            reddit.subreddits.search_by_name(subreddit, exact=True)
+        found, ttl = True, settings.REDDIT_FOUND_CACHE_TTL
     except NotFound:
-        return False
+        found, ttl = False, settings.REDDIT_NOT_FOUND_CACHE_TTL
+
+    cache.set(
+        SUBREDDIT_FOUND_CACHE_KEY.format(normalize_subreddit(subreddit)),
+        found,
+        ttl,
+    )
+    return found
+
+
+def cached_subreddit_found(subreddit):
+    """
+    Returns the cached answer of ``subreddit_found`` without calling Reddit.
+
+    Args:
+        subreddit (str): The name of the subreddit.
+
+    Returns:
+        bool | None: The cached answer, None if the subreddit hasn't been checked.
+    """
+    return cache.get(
+        SUBREDDIT_FOUND_CACHE_KEY.format(normalize_subreddit(subreddit))
+    )
+
+
+def subreddit_exists(subreddit, timeout=None):
+    """
+    Checks if a subreddit exists without blocking for longer than ``timeout``.
+
+    Cached answers are returned straight away. Otherwise the lookup runs on a
+    background thread; if it doesn't finish in time it keeps running and caches
+    its answer for the next call.
+
+    Args:
+        subreddit (str): The name of the subreddit.
+        timeout (float): Seconds to wait, defaults to ``REDDIT_LOOKUP_TIMEOUT``.
+
+    Returns:
+        bool | None: True or False, None if the lookup couldn't complete in time
+        or failed.
+    """
+    global _lookup_executor
+
+    found = cached_subreddit_found(subreddit)
+    if found is not None:
+        return found
+
+    if timeout is None:
+        timeout = settings.REDDIT_LOOKUP_TIMEOUT
+    with _client_lock:
+        if _lookup_executor is None:
+            _lookup_executor = ThreadPoolExecutor(
+                max_workers=2, thread_name_prefix="reddit-lookup"
+            )
+    future = _lookup_executor.submit(subreddit_found, subreddit)
+    try:
+        return future.result(timeout=timeout)
+    except (FutureTimeoutError, PrawcoreException, PRAWException):
+        return None
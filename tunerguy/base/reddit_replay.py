@@ -0,0 +1,250 @@
+"""
+reddit_replay module
+
+This module provides a local stand-in for the Reddit API so ``reddit_api`` can be
+exercised and benchmarked without credentials or network access.
+
+``ReplayRequestor`` plugs into PRAW through ``reddit_api.use_requestor``. It serves
+responses recorded by ``RecordingRequestor`` and synthesizes the ones that weren't
+recorded, with optional latency and error injection.
+
+Recorded paths are stored with the subreddit name replaced by ``{subreddit}``, so
+a listing recorded for one subreddit is served for any subreddit.
+
+Module Classes:
+    - ReplaySession: ``requests.Session`` stand-in serving recorded or synthetic
+      responses.
+    - ReplayRequestor: ``PooledRequestor`` using a ``ReplaySession``.
+    - RecordingSession: ``requests.Session`` saving every JSON response it gets.
+    - RecordingRequestor: ``PooledRequestor`` using a ``RecordingSession``.
+
+Module Functions:
+    - fixture_key(method, url): Returns the fixture key of a request.
+"""
+
+import json
+import random
+import re
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from .reddit_api import TOKEN_PATH, PooledRequestor
+
+SUBREDDIT_PATH = re.compile(r"^/r/[^/]+")
+
+
+def fixture_key(method, url):
+    """
+    Returns the fixture key of a request, e.g. "GET /r/{subreddit}/hot".
+
+    Args:
+        method (str): The HTTP method.
+        url (str): The requested URL.
+
+    Returns:
+        str: The upper-cased method and the path without its subreddit name.
+    """
+    path = SUBREDDIT_PATH.sub("/r/{subreddit}", urlsplit(url).path)
+    return f"{method.upper()} {path.rstrip('/')}"
+
+
+def _subreddit_name(url):
+    match = SUBREDDIT_PATH.match(urlsplit(url).path)
+    return match.group(0)[len("/r/") :] if match else "replay"
+
+
+def _listing(subreddit, limit=10):
+    children = [
+        {
+            "kind": "t3",
+            "data": {
+                "id": f"{subreddit}{rank}",
+                "name": f"t3_{subreddit}{rank}",
+                "title": f"Post {rank} in r/{subreddit}",
+                "author": "mod0" if rank == 0 else f"user{rank}",
+                "permalink": f"/r/{subreddit}/comments/{subreddit}{rank}/post/",
+                "score": 1000 - rank,
+                "subreddit": subreddit,
+                "stickied": rank == 0,
+                "thumbnail": "self",
+                "created_utc": 0,
+            },
+        }
+        for rank in range(limit)
+    ]
+    return {"kind": "Listing", "data": {"after": None, "children": children}}
+
+
+def _synthesize(method, url, data):
+    """Returns the status and body of a synthetic response for a request."""
+    key = fixture_key(method, url)
+    subreddit = _subreddit_name(url)
+
+    if key.endswith(TOKEN_PATH):
+        return 200, {
+            "access_token": "replay",
+            "expires_in": 3600,
+            "scope": "*",
+            "token_type": "bearer",
+        }
+    if key == "GET /r/{subreddit}/about/moderators":
+        return 200, {
+            "kind": "UserList",
+            "data": {
+                "children": [
+                    {
+                        "name": "mod0",
+                        "id": "t2_mod0",
+                        "date": 0,
+                        "mod_permissions": ["all"],
+                    }
+                ]
+            },
+        }
+    if key.startswith("GET /r/{subreddit}/"):
+        return 200, _listing(subreddit)
+    if key == "POST /api/search_reddit_names":
+        return 200, {"names": [dict(data or {}).get("query", subreddit)]}
+    return 404, {"message": "Not Found", "error": 404}
+
+
+class ReplaySession:
+    """
+    ``requests.Session`` stand-in serving recorded or synthetic responses.
+
+    Attributes:
+        fixtures (dict): Recorded responses keyed by ``fixture_key``.
+        latency (float): Seconds every request is delayed by.
+        jitter (float): Maximum random seconds added to ``latency``.
+        error_rate (float): Share of requests answered with a 503.
+        requests (int): Number of requests served.
+    """
+
+    def __init__(
+        self, fixtures=None, latency=0.0, jitter=0.0, error_rate=0.0, seed=None
+    ):
+        if isinstance(fixtures, str):
+            with open(fixtures) as fixtures_file:
+                fixtures = json.load(fixtures_file)
+        self.fixtures = fixtures or {}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self.headers = CaseInsensitiveDict()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def request(self, method, url, data=None, **kwargs):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            failed = self._random.random() < self.error_rate
+
+        if delay:
+            time.sleep(delay)
+
+        headers = {}
+        if failed:
+            status, body = 503, {
+                "message": "Service Unavailable",
+                "error": 503,
+            }
+        elif fixture_key(method, url) in self.fixtures:
+            fixture = self.fixtures[fixture_key(method, url)]
+            status, body = fixture["status"], fixture["body"]
+            headers = fixture.get("headers", {})
+        else:
+            status, body = _synthesize(method, url, data)
+
+        response = requests.Response()
+        response.status_code = status
+        response.url = url
+        response.encoding = "utf-8"
+        response.headers.update(headers)
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps(body).encode()
+        return response
+
+    def close(self):
+        pass
+
+
+class ReplayRequestor(PooledRequestor):
+    """
+    ``PooledRequestor`` serving responses from a ``ReplaySession``.
+
+    Usage:
+        ``reddit_api.use_requestor(ReplayRequestor, latency=0.05)``; keyword
+        arguments are passed on to ``ReplaySession``.
+    """
+
+    def __init__(self, *args, session=None, **kwargs):
+        replay_kwargs = {
+            name: kwargs.pop(name)
+            for name in ("fixtures", "latency", "jitter", "error_rate", "seed")
+            if name in kwargs
+        }
+        super().__init__(
+            *args, session=session or ReplaySession(**replay_kwargs), **kwargs
+        )
+
+
+class RecordingSession(requests.Session):
+    """
+    ``requests.Session`` saving the JSON responses it gets as fixtures.
+
+    Attributes:
+        path (str): File the fixtures are written to after every response.
+        fixtures (dict): Recorded responses keyed by ``fixture_key``.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.fixtures = {}
+        self._lock = threading.Lock()
+
+    def request(self, method, url, *args, **kwargs):
+        response = super().request(method, url, *args, **kwargs)
+        key = fixture_key(method, url)
+        if key.endswith(TOKEN_PATH):
+            # Never write credentials to disk.
+            return response
+
+        try:
+            body = response.json()
+        except ValueError:
+            return response
+
+        with self._lock:
+            self.fixtures[key] = {
+                "status": response.status_code,
+                "headers": {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name.lower().startswith("x-ratelimit")
+                },
+                "body": body,
+            }
+            with open(self.path, "w") as fixtures_file:
+                json.dump(self.fixtures, fixtures_file, indent=2)
+        return response
+
+
+class RecordingRequestor(PooledRequestor):
+    """
+    ``PooledRequestor`` recording the live responses it gets.
+
+    Usage:
+        ``reddit_api.use_requestor(RecordingRequestor, path="fixtures.json")``.
+    """
+
+    def __init__(self, *args, path, session=None, **kwargs):
+        super().__init__(
+            *args, session=session or RecordingSession(path), **kwargs
+        )
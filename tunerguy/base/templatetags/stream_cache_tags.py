@@ -0,0 +1,136 @@
+"""
+stream_cache_tags module
+
+This module provides the ``{% streamcache %}`` tag, which caches the rendered HTML
+of a page's StreamField.
+
+Fragments are keyed by the page, the field and the page's live revision, so they
+are reused across requests, including ones the page cache can't serve such as
+logged in users', until the page is published again. The field's own cache
+version is part of the key too: the objects a field shows, e.g. images, are
+recorded as the field's dependencies when the fragment renders, so they
+invalidate it when they change, whether or not the page itself is served from the
+page cache. Other dependencies of the page, such as the menu or the posts it
+lists, leave the fragment cached.
+
+Module Functions:
+    - streamcache(parser, token): Compiles the ``{% streamcache %}`` tag.
+    - stream_cache_stats(): Returns the fragment cache's counters.
+"""
+
+import time
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+
+from tunerguy.base import page_cache
+
+register = template.Library()
+
+FRAGMENT_CACHE_KEY = "stream_cache:fragment:{}:{}:{}:{}"
+STATS_CACHE_KEY = "stream_cache:stats:{}:{}"
+
+
+def _count(field_name, stat, amount=1):
+    key = STATS_CACHE_KEY.format(field_name, stat)
+    cache.add(key, 0, timeout=None)
+    cache.incr(key, amount)
+
+
+def stream_cache_stats(field_names):
+    """
+    Returns the fragment cache's counters for StreamFields.
+
+    Args:
+        field_names (list): Names of the StreamFields, e.g. ["body"].
+
+    Returns:
+        dict: Per field name, the ``hits``, ``misses`` and ``saved_us``, the
+        microseconds of rendering the hits saved.
+    """
+    stats = ("hits", "misses", "saved_us")
+    counters = cache.get_many(
+        [
+            STATS_CACHE_KEY.format(field_name, stat)
+            for field_name in field_names
+            for stat in stats
+        ]
+    )
+    return {
+        field_name: {
+            stat: counters.get(STATS_CACHE_KEY.format(field_name, stat), 0)
+            for stat in stats
+        }
+        for field_name in field_names
+    }
+
+
+class StreamCacheNode(template.Node):
+    def __init__(self, nodelist, page, field_name):
+        self.nodelist = nodelist
+        self.page = page
+        self.field_name = field_name
+
+    def render(self, context):
+        page = self.page.resolve(context)
+        field_name = self.field_name.resolve(context)
+        request = context.get("request")
+        # Previews render unsaved content under the live revision's id.
+        if (
+            getattr(request, "is_preview", False)
+            or page.live_revision_id is None
+        ):
+            return self.nodelist.render(context)
+
+        version_id = page_cache.fragment_id(page, field_name)
+        key = FRAGMENT_CACHE_KEY.format(
+            page.pk,
+            field_name,
+            page.live_revision_id,
+            page_cache.page_version(version_id),
+        )
+        cached = cache.get(key)
+        if cached is not None:
+            _count(field_name, "hits")
+            _count(field_name, "saved_us", cached["render_us"])
+            return cached["html"]
+
+        # Recorded before rendering, so a change to one of the objects while
+        # rendering invalidates the fragment being cached.
+        page_cache.record_dependents(
+            version_id,
+            page_cache.stream_dependencies(getattr(page, field_name)),
+        )
+        start = time.perf_counter()
+        html = self.nodelist.render(context)
+        render_us = round((time.perf_counter() - start) * 1_000_000)
+        cache.set(
+            key,
+            {"html": html, "render_us": render_us},
+            settings.STREAM_CACHE_TIMEOUT,
+        )
+        _count(field_name, "misses")
+        return html
+
+
+@register.tag
+def streamcache(parser, token):
+    """
+    Caches the HTML of a page's StreamField, see the module docstring.
+
+    Usage:
+        ``{% streamcache page "body" %}{{ page.body }}{% endstreamcache %}``
+    """
+    bits = token.split_contents()
+    if len(bits) != 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a page and a field name."
+        )
+    nodelist = parser.parse(("endstreamcache",))
+    parser.delete_first_token()
+    return StreamCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        parser.compile_filter(bits[2]),
+    )
@@ -0,0 +1,112 @@
+import threading
+import time
+from unittest import mock
+
+import fakeredis
+from django.test import SimpleTestCase, override_settings
+
+from tunerguy.base import locks
+
+
+class RedisTestCase(SimpleTestCase):
+    """Runs each test against its own in-memory fake Redis."""
+
+    def setUp(self):
+        self.redis = fakeredis.FakeRedis()
+        patcher = mock.patch.object(locks, "_redis", self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+
+class LeaseTests(RedisTestCase):
+    def test_acquire_skips_while_held(self):
+        token = locks.acquire_lease("job")
+
+        self.assertIsNotNone(token)
+        self.assertIsNone(locks.acquire_lease("job"))
+        self.assertIsNone(locks.acquire_lease("job"))
+        self.assertEqual(locks.skipped_runs("job"), 2)
+        self.assertEqual(locks.skipped_runs("other"), 0)
+
+    def test_release_needs_the_token(self):
+        token = locks.acquire_lease("job")
+
+        self.assertFalse(locks.release_lease("job", "not-the-token"))
+        self.assertIsNone(locks.acquire_lease("job"))
+        self.assertTrue(locks.release_lease("job", token))
+        self.assertIsNotNone(locks.acquire_lease("job"))
+
+    def test_lease_expires(self):
+        token = locks.acquire_lease("job", lease=0.1)
+        time.sleep(0.2)
+
+        self.assertIsNotNone(locks.acquire_lease("job"))
+        self.assertFalse(locks.renew_lease("job", token))
+        self.assertFalse(locks.release_lease("job", token))
+
+    def test_renew_extends_the_lease(self):
+        token = locks.acquire_lease("job", lease=0.2)
+        time.sleep(0.1)
+        self.assertTrue(locks.renew_lease("job", token, lease=0.3))
+        time.sleep(0.15)
+
+        self.assertIsNone(locks.acquire_lease("job"))
+        self.assertGreater(self.redis.pttl("lock:job"), 0)
+
+
+class SingleFlightTests(RedisTestCase):
+    def test_skips_calls_while_running(self):
+        calls = []
+
+        @locks.single_flight(name="job")
+        def job():
+            calls.append("outer")
+            # A call while the first one runs, e.g. from another worker.
+            self.assertIsNone(nested())
+            return "done"
+
+        @locks.single_flight(name="job")
+        def nested():
+            calls.append("nested")
+
+        self.assertEqual(job(), "done")
+        self.assertEqual(calls, ["outer"])
+        self.assertEqual(locks.skipped_runs("job"), 1)
+        # Released once the call returns.
+        self.assertEqual(nested(), None)
+        self.assertEqual(calls, ["outer", "nested"])
+
+    def test_releases_when_the_call_raises(self):
+        @locks.single_flight(name="job")
+        def job():
+            raise ValueError
+
+        with self.assertRaises(ValueError):
+            job()
+        self.assertIsNotNone(locks.acquire_lease("job"))
+
+    def test_defaults_to_the_function_name(self):
+        @locks.single_flight()
+        def job():
+            return locks.acquire_lease(f"{__name__}.{job.__qualname__}")
+
+        self.assertIsNone(job())
+
+    @override_settings(TASK_LOCK_LEASE=0.2)
+    def test_renews_the_lease_of_long_calls(self):
+        started = threading.Event()
+
+        @locks.single_flight(name="job")
+        def job():
+            started.set()
+            # Outlives the lease several times over.
+            time.sleep(0.7)
+
+        thread = threading.Thread(target=job)
+        thread.start()
+        started.wait()
+        time.sleep(0.5)
+        self.assertIsNone(locks.acquire_lease("job"))
+        thread.join()
+
+        self.assertIsNotNone(locks.acquire_lease("job"))
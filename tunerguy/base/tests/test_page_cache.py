@@ -0,0 +1,74 @@
+from threading import Barrier, Thread
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from wagtail.rich_text import RichText
+
+from tunerguy.base import page_cache
+
+
+class DependentsIndexTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_invalidate_bumps_the_dependent_pages(self):
+        page_cache.record_dependents(1, ["menu", "descendants:3"])
+        page_cache.record_dependents(2, ["menu"])
+
+        self.assertEqual(page_cache.invalidate("menu"), {1, 2})
+        self.assertEqual(page_cache.page_version(1), 1)
+        self.assertEqual(page_cache.page_version(2), 1)
+        # Invalidated entries are dropped, the others kept.
+        self.assertEqual(page_cache.invalidate("menu"), set())
+        self.assertEqual(page_cache.invalidate("descendants:3"), {1})
+
+    def test_pages_are_recorded_again_after_invalidation(self):
+        page_cache.record_dependents(1, ["menu"])
+        page_cache.record_dependents(1, ["menu"])
+        page_cache.invalidate("menu")
+        page_cache.record_dependents(1, ["menu"])
+
+        self.assertEqual(page_cache.invalidate("menu"), {1})
+
+    def test_concurrent_renders_keep_every_entry(self):
+        pages = range(1, 21)
+        barrier = Barrier(len(pages))
+
+        def render(page_id):
+            barrier.wait()
+            page_cache.record_dependents(page_id, ["menu"])
+
+        threads = [Thread(target=render, args=(page,)) for page in pages]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(page_cache.invalidate("menu"), set(pages))
+
+    def test_slot_claimed_by_an_invalidation_before_it_was_set(self):
+        # The invalidation read the count, 1, before the render set slot 1.
+        cache.set("page_cache:dependents:menu:count", 0)
+        cache.set("page_cache:dependents:menu:start", 1)
+
+        page_cache.record_dependents(1, ["menu"])
+
+        self.assertEqual(page_cache.page_version(1), 1)
+        # Not marked as recorded, so the next render records it again.
+        page_cache.record_dependents(1, ["menu"])
+        self.assertEqual(page_cache.invalidate("menu"), {1})
+
+
+class RichTextDependenciesTests(SimpleTestCase):
+    def test_linked_pages_and_embedded_images(self):
+        value = RichText(
+            '<p><a linktype="page" id="3">Golf</a> '
+            '<a href="https://example.com">Elsewhere</a></p>'
+            '<embed alt="GTI" embedtype="image" format="left" id="7"/>'
+        )
+
+        self.assertEqual(
+            list(page_cache.stream_dependencies([value])),
+            ["wagtailcore.page:3", "wagtailimages.image:7"],
+        )
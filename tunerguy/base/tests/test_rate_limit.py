@@ -0,0 +1,98 @@
+import fakeredis
+from django.test import SimpleTestCase
+
+from tunerguy.base.rate_limit import SharedTokenBucket, TokenBucket
+
+
+class FakeClock:
+    """A clock that only moves when slept on or advanced."""
+
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TokenBucketTests(SimpleTestCase):
+    def make_bucket(self, capacity, rate):
+        return TokenBucket(
+            capacity, rate, clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def test_bursts_then_waits_for_refills(self):
+        bucket = self.make_bucket(capacity=3, rate=0.5)
+
+        waits = [bucket.acquire() for _ in range(5)]
+
+        self.assertEqual(waits, [0, 0, 0, 2, 2])
+        self.assertEqual(self.clock.slept, [2, 2])
+        self.assertEqual(bucket.stats()["waited"], 4)
+
+    def test_refills_up_to_capacity(self):
+        bucket = self.make_bucket(capacity=3, rate=1)
+        for _ in range(3):
+            bucket.acquire()
+        self.clock.now += 60
+
+        self.assertEqual(bucket.stats()["tokens"], 3)
+
+    def test_sync_spreads_the_remaining_quota_until_reset(self):
+        bucket = self.make_bucket(capacity=10, rate=1)
+
+        bucket.sync(remaining=2, reset=100)
+
+        self.assertEqual(
+            bucket.stats(), {"tokens": 2, "rate": 0.02, "waited": 0}
+        )
+        self.assertEqual([bucket.acquire() for _ in range(3)], [0, 0, 50])
+
+    def test_rate_recovers_once_the_quota_resets(self):
+        bucket = self.make_bucket(capacity=10, rate=1)
+        bucket.sync(remaining=0, reset=10)
+        self.clock.now += 10
+
+        self.assertEqual(bucket.stats()["rate"], 1)
+
+
+class SharedTokenBucketTests(TokenBucketTests):
+    """The shared bucket behaves the same, and shares its budget."""
+
+    def setUp(self):
+        super().setUp()
+        self.redis = fakeredis.FakeRedis()
+
+    def make_bucket(self, capacity, rate):
+        return SharedTokenBucket(
+            self.redis,
+            "reddit",
+            capacity,
+            rate,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+
+    def test_processes_share_the_budget(self):
+        buckets = [self.make_bucket(capacity=4, rate=1) for _ in range(2)]
+
+        waits = [bucket.acquire() for _ in range(3) for bucket in buckets]
+
+        self.assertEqual(waits, [0, 0, 0, 0, 1, 1])
+
+    def test_processes_share_the_synced_quota(self):
+        first, second = (self.make_bucket(capacity=10, rate=1) for _ in "ab")
+
+        first.sync(remaining=1, reset=60)
+
+        self.assertEqual(second.stats()["tokens"], 1)
+        self.assertEqual(second.stats()["rate"], round(1 / 60, 4))
+        self.assertEqual(second.acquire(), 0)
+        self.assertEqual(first.acquire(), 60)
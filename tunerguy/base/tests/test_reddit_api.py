@@ -0,0 +1,155 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import fakeredis
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from prawcore.rate_limit import RateLimiter
+
+from tunerguy.base import locks, reddit_api
+from tunerguy.base.rate_limit import SharedTokenBucket
+from tunerguy.base.reddit_replay import ReplayRequestor, _listing
+
+from .test_rate_limit import FakeClock
+
+
+class ReplayTestCase(SimpleTestCase):
+    """Talks to the offline stand-in for Reddit, see ``reddit_replay``."""
+
+    requestor_kwargs = {}
+
+    def setUp(self):
+        # PRAW refuses to start without credentials, the stand-in ignores them.
+        patcher = mock.patch.dict(
+            os.environ,
+            {
+                "REDDIT_ID": "replay",
+                "REDDIT_SECRET": "replay",
+                "REDDIT_USER": "replay",
+                "REDDIT_USER_PW": "replay",
+                "REDDIT_USER_AGENT": "tunerguy tests",
+            },
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(locks, "_redis", fakeredis.FakeRedis())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        cache.clear()
+        self.addCleanup(cache.clear)
+        reddit_api.use_requestor(ReplayRequestor, **self.requestor_kwargs)
+        self.addCleanup(reddit_api.use_requestor)
+        reddit_api._stats.clear()
+
+
+@override_settings(
+    REDDIT_RATE_LIMIT_PER_MINUTE=10**9, REDDIT_RATE_LIMIT_BURST=10**9
+)
+class SharedClientTests(ReplayTestCase):
+    requestor_kwargs = {"latency": 0.01}
+
+    def test_threads_share_one_token(self):
+        subreddits = [f"gti{n}" for n in range(16)]
+        with ThreadPoolExecutor(8) as executor:
+            posts = list(executor.map(reddit_api.get_reddit_posts, subreddits))
+
+        self.assertTrue(all(posts))
+        stats = reddit_api.client_stats()
+        self.assertEqual(stats["clients_created"], 1)
+        self.assertEqual(stats["token_grants"], 1)
+
+
+class RateLimitTests(ReplayTestCase):
+    # Listings report the quota nearly spent: 3 requests left for 30 seconds.
+    requestor_kwargs = {
+        "fixtures": {
+            "GET /r/{subreddit}/hot": {
+                "status": 200,
+                "body": _listing("gti"),
+                "headers": {
+                    "x-ratelimit-remaining": "3",
+                    "x-ratelimit-reset": "30",
+                    "x-ratelimit-used": "97",
+                },
+            }
+        }
+    }
+
+    def setUp(self):
+        super().setUp()
+        self.clock = FakeClock()
+        rate_limiter = SharedTokenBucket(
+            locks.get_redis(),
+            "reddit",
+            capacity=10,
+            rate=1,
+            clock=self.clock,
+            sleep=self.clock.sleep,
+        )
+        patchers = [
+            mock.patch.object(reddit_api, "_rate_limiter", rate_limiter),
+            # prawcore paces itself from the same headers, in real time.
+            mock.patch.object(RateLimiter, "delay"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_low_remaining_quota_throttles_requests(self):
+        # The first listing request spends the burst down to its reported 3.
+        reddit_api.get_reddit_posts("gti")
+        self.assertEqual(self.clock.slept, [])
+
+        for subreddit in ("golf", "polo", "up", "lupo"):
+            reddit_api.get_reddit_posts(subreddit)
+
+        # Of the 8 further requests, moderators and listings, the 3 remaining
+        # go straight away and the others wait as they're spread over the 30
+        # seconds left.
+        self.assertEqual(len(self.clock.slept), 5)
+        self.assertGreaterEqual(min(self.clock.slept), 10 - 1e-6)
+        self.assertEqual(reddit_api.client_stats()["rate_limit"]["rate"], 0.1)
+
+
+class StoreThumbnailsTests(SimpleTestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def store(self, url, content_type, content):
+        response = mock.Mock(headers={"Content-Type": content_type})
+        response.raw.read.return_value = content
+        posts = [{"id": "a1", "thumbnail": url}]
+        with mock.patch.object(
+            reddit_api.requests, "get", return_value=response
+        ):
+            reddit_api.store_thumbnails(posts)
+        return posts[0].get("thumbnail_url")
+
+    def test_extension_follows_the_content_type(self):
+        url = self.store(
+            "https://b.thumbs.redditmedia.com/a1.svg",
+            "image/png; charset=binary",
+            b"\x89PNG\r\n\x1a\n...",
+        )
+
+        self.assertEqual(url, "/media/reddit/thumbnails/a1.png")
+
+    def test_scriptable_images_are_not_stored(self):
+        svg = b'<svg xmlns="http://www.w3.org/2000/svg"><script/></svg>'
+        for content_type in ["image/svg+xml", "text/html"]:
+            with self.subTest(content_type):
+                self.assertIsNone(
+                    self.store("https://example.com/a1.png", content_type, svg)
+                )
+
+    def test_content_must_match_the_content_type(self):
+        self.assertIsNone(
+            self.store("https://example.com/a1.jpg", "image/jpeg", b"<svg/>")
+        )
@@ -0,0 +1,77 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from wagtail.images import get_image_model
+from wagtail.images.tests.utils import get_test_image_file
+from wagtail.models import Page
+
+from tunerguy.base import page_cache
+from tunerguy.base.templatetags.stream_cache_tags import stream_cache_stats
+from tunerguy.blog.models import BlogIndexPage
+
+TEMPLATE = Template(
+    "{% load stream_cache_tags wagtailcore_tags %}"
+    '{% streamcache page "featured_cars" %}'
+    "{% for block in page.featured_cars %}{% include_block block %}{% endfor %}"
+    "{% endstreamcache %}"
+)
+
+
+class StreamCacheTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+        self.image = get_image_model().objects.create(
+            title="Golf GTI", file=get_test_image_file()
+        )
+        index = Page.get_first_root_node().add_child(
+            instance=BlogIndexPage(
+                title="Blog",
+                slug="blog",
+                featured_cars=[
+                    (
+                        "Car",
+                        {
+                            "title": "GTI",
+                            "description": "Hot hatch",
+                            "url": "https://example.com/gti/",
+                            "image": self.image,
+                        },
+                    )
+                ],
+            )
+        )
+        index.save_revision().publish()
+        self.page_id = index.pk
+
+    def render(self):
+        page = BlogIndexPage.objects.get(pk=self.page_id)
+        return TEMPLATE.render(Context({"page": page}))
+
+    def test_changed_images_invalidate_the_fragment(self):
+        self.assertIn('alt="Golf GTI"', self.render())
+
+        self.image.title = "Golf GTI Mk7"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.image.save()
+
+        self.assertIn('alt="Golf GTI Mk7"', self.render())
+
+    def test_other_dependencies_of_the_page_keep_the_fragment(self):
+        page_cache.record_dependents(self.page_id, ["menu"])
+        self.render()
+
+        self.assertEqual(page_cache.invalidate("menu"), {self.page_id})
+        self.render()
+
+        stats = stream_cache_stats(["featured_cars"])["featured_cars"]
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
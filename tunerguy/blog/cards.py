@@ -0,0 +1,134 @@
+"""
+cards module
+
+This module provides the preview cards of posts listed by
+``blog/includes/article_list.html``.
+
+Listings render a handful of fields per post, so rather than loading
+``BlogPage`` instances they read a ``values()`` projection of those fields and
+build compact cards from it, resolving every card's URL in one batch.
+
+Module Classes:
+    - ArticleCard: A post's preview card.
+
+Module Functions:
+    - blog_page_values(posts): Projects a ``BlogPage`` queryset onto the card
+      fields.
+"""
+
+from django.core.files.storage import default_storage
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Trim
+
+from tunerguy.base.navigation import page_urls
+
+
+class ArticleCard:
+    """
+    A post's preview card.
+
+    Attributes:
+        pk (int): The post's id.
+        title (str): The post's title.
+        url (str): The post's URL.
+        snippet (str): The post's excerpt.
+        image_url (str): The URL of the post's featured image.
+        author_name (str): The full name of the post's author.
+        date (date): The post's date.
+
+    Methods:
+        - from_rows(rows): Builds the cards of ``values()`` rows.
+
+    Usage:
+        Build cards from rows with the ``FIELDS`` keys, e.g. from
+        ``blog_page_values`` or ``CategoryLatestPost``::
+
+            cards = ArticleCard.from_rows(
+                CategoryLatestPost.objects.values(*ArticleCard.FIELDS)
+            )
+    """
+
+    # Without a __dict__, a card only takes the memory of its fields.
+    __slots__ = (
+        "pk",
+        "title",
+        "url",
+        "snippet",
+        "image_url",
+        "author_name",
+        "date",
+    )
+
+    # The keys of the rows cards are built from.
+    FIELDS = (
+        "post_id",
+        "title",
+        "url_path",
+        "snippet",
+        "featured_image",
+        "author_name",
+        "date",
+    )
+
+    def __init__(self, pk, title, url, snippet, image_url, author_name, date):
+        self.pk = pk
+        self.title = title
+        self.url = url
+        self.snippet = snippet
+        self.image_url = image_url
+        self.author_name = author_name
+        self.date = date
+
+    def __repr__(self):
+        return f"<ArticleCard {self.pk}: {self.title}>"
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds the cards of ``values()`` rows, resolving their URLs in one
+        batch.
+
+        Args:
+            rows (iterable): Dicts with the ``FIELDS`` keys.
+
+        Returns:
+            list: An ``ArticleCard`` per row, in order.
+        """
+        rows = list(rows)
+        urls = page_urls(row["url_path"] for row in rows)
+        return [
+            cls(
+                pk=row["post_id"],
+                title=row["title"],
+                url=urls[row["url_path"]],
+                snippet=row["snippet"],
+                image_url=default_storage.url(row["featured_image"]),
+                author_name=row["author_name"],
+                date=row["date"],
+            )
+            for row in rows
+        ]
+
+
+def blog_page_values(posts):
+    """
+    Projects a ``BlogPage`` queryset onto the card fields.
+
+    Args:
+        posts (QuerySet): The ``BlogPage``'s.
+
+    Returns:
+        QuerySet: Dicts with the ``ArticleCard.FIELDS`` keys.
+    """
+    return posts.values(
+        "title",
+        "url_path",
+        "snippet",
+        "featured_image",
+        "date",
+        post_id=F("pk"),
+        # As User.get_full_name() returns it.
+        author_name=Trim(
+            Concat("author__first_name", Value(" "), "author__last_name")
+        ),
+    )
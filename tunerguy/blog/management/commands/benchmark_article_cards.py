@@ -0,0 +1,114 @@
+import gc
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.template.loader import get_template
+from django.test.utils import CaptureQueriesContext
+
+from tunerguy.blog.cards import ArticleCard
+from tunerguy.blog.models import BlogPage, CategoryPage
+
+
+def load_instances(category, limit):
+    """Load the posts as the listings did before cards, as model instances."""
+    return list(
+        BlogPage.objects.live()
+        .filter(category=category)
+        .select_related("author")
+        .order_by("-date", "-pk")
+        .only(
+            "snippet",
+            "title",
+            "date",
+            "featured_image",
+            "author__first_name",
+            "author__last_name",
+            "url_path",
+            "page_ptr_id",
+            "category_id",
+        )[:limit]
+    )
+
+
+def load_cards(category, limit):
+    """Load the posts as the listings do, as ``ArticleCard``'s."""
+    return ArticleCard.from_rows(category.posts_after()[:limit])
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the memory per post and the time to load and render "
+        "article_list.html of a category's posts as BlogPage instances and as "
+        "ArticleCard's."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page",
+            type=int,
+            help="Id of the CategoryPage, defaults to the one with most posts.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=1000,
+            help="Maximum number of posts loaded.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Number of timed runs, the fastest is reported.",
+        )
+
+    def handle(self, *args, **options):
+        categories = CategoryPage.objects.live()
+        if options["page"]:
+            categories = categories.filter(pk=options["page"])
+        category = (
+            categories.annotate(post_count=Count("category_posts"))
+            .order_by("-post_count")
+            .first()
+        )
+        if category is None or not category.post_count:
+            raise CommandError("No live CategoryPage with posts found.")
+
+        self.stdout.write(f"{category.title}: {category.post_count} posts")
+        template = get_template("blog/includes/article_list.html")
+        for label, load in (
+            ("BlogPage instances", load_instances),
+            ("ArticleCard's", load_cards),
+        ):
+            self.report(label, load, category, template, options)
+
+    def report(self, label, load, category, template, options):
+        limit = options["limit"]
+        load(category, limit)  # Warm up the caches, e.g. the site root paths.
+
+        gc.collect()
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            posts = load(category, limit)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        load_times, render_times = [], []
+        for _ in range(options["repeat"]):
+            start = time.perf_counter()
+            posts = load(category, limit)
+            load_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            # Renders the way listings do, resolving each post's URL.
+            template.render({"article_list": posts})
+            render_times.append(time.perf_counter() - start)
+
+        self.stdout.write(
+            f"  {label}: {len(posts)} posts, {len(queries)} queries, "
+            f"{retained / len(posts):,.0f} bytes retained per post "
+            f"(peak {peak / len(posts):,.0f}), "
+            f"load {min(load_times) * 1000:.1f} ms, "
+            f"render {min(render_times) * 1000:.1f} ms"
+        )
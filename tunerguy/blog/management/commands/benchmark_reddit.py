@@ -0,0 +1,135 @@
+import math
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from tunerguy.base import reddit_api
+from tunerguy.base.reddit_replay import ReplayRequestor
+from tunerguy.blog.tasks import fetch_subreddit
+
+
+def percentile(values, percent):
+    """Return the nearest-rank ``percent`` percentile of ``values``."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark refreshing synthetic subreddits against an offline stand-in "
+        "for the Reddit API."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--subreddits",
+            type=int,
+            default=50,
+            help="Number of synthetic subreddits to refresh.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=settings.REDDIT_REFRESH_CONCURRENCY,
+            help=(
+                "Number of threads refreshing subreddits, their requests take "
+                "turns on the process' Reddit client."
+            ),
+        )
+        parser.add_argument(
+            "--latency",
+            type=float,
+            default=0.05,
+            help="Seconds every request to Reddit is delayed by.",
+        )
+        parser.add_argument(
+            "--jitter",
+            type=float,
+            default=0.0,
+            help="Maximum random seconds added to the latency.",
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0.0,
+            help="Share of requests answered with a 503.",
+        )
+        parser.add_argument(
+            "--rate-limit",
+            type=int,
+            default=0,
+            help="Requests per minute allowed by the rate limiter, 0 for none.",
+        )
+        parser.add_argument(
+            "--fixtures",
+            help="JSON fixtures recorded with RecordingRequestor to serve.",
+        )
+        parser.add_argument("--seed", type=int, help="Seed for the jitter.")
+        parser.add_argument(
+            "--warm",
+            action="store_true",
+            help="Keep cached moderator lists from a previous run.",
+        )
+
+    def handle(self, *args, **options):
+        # PRAW refuses to start without credentials, the stand-in ignores them.
+        for name in (
+            "REDDIT_ID",
+            "REDDIT_SECRET",
+            "REDDIT_USER",
+            "REDDIT_USER_PW",
+        ):
+            os.environ.setdefault(name, "replay")
+        os.environ.setdefault("REDDIT_USER_AGENT", "tunerguy benchmark")
+
+        subreddits = [f"bench{n}" for n in range(options["subreddits"])]
+        if not options["warm"]:
+            for subreddit in subreddits:
+                reddit_api.invalidate_moderators(subreddit)
+
+        rate_limit = options["rate_limit"] or 10**9
+        with override_settings(
+            REDDIT_RATE_LIMIT_PER_MINUTE=rate_limit,
+            REDDIT_RATE_LIMIT_BURST=settings.REDDIT_RATE_LIMIT_BURST
+            if options["rate_limit"]
+            else rate_limit,
+        ):
+            reddit_api.use_requestor(
+                ReplayRequestor,
+                fixtures=options["fixtures"],
+                latency=options["latency"],
+                jitter=options["jitter"],
+                error_rate=options["error_rate"],
+                seed=options["seed"],
+            )
+            try:
+                start = time.monotonic()
+                with ThreadPoolExecutor(options["concurrency"]) as executor:
+                    results = list(
+                        executor.map(fetch_subreddit.run, subreddits)
+                    )
+                wall_time = time.monotonic() - start
+                stats = reddit_api.client_stats()
+            finally:
+                reddit_api.use_requestor()
+
+        timings = [result["seconds"] for result in results]
+        failed = [result for result in results if result["error"]]
+        self.stdout.write(
+            f"Refreshed {len(results)} subreddits ({len(failed)} failed) "
+            f"in {wall_time:.3f}s with {options['concurrency']} workers"
+        )
+        if timings:
+            self.stdout.write(
+                f"Per subreddit: p50 {percentile(timings, 50):.3f}s, "
+                f"p95 {percentile(timings, 95):.3f}s, max {max(timings):.3f}s"
+            )
+        self.stdout.write(
+            f"Token grants: {stats['token_grants']}, "
+            f"rate limit wait: {stats['rate_limit']['waited']:.3f}s"
+        )
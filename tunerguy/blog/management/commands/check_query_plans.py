@@ -0,0 +1,155 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from wagtail.models import Page
+
+from tunerguy.blog.models import (
+    BlogComment,
+    BlogPage,
+    CarHubPage,
+    CategoryPage,
+)
+
+
+def hot_queries():
+    """
+    Return the hot listing queries as (name, queryset, tables, ordered) tuples:
+    each of ``tables`` must be searched through an index rather than scanned,
+    even in index order, and, if ``ordered``, the rows must come out of the
+    index already sorted.
+
+    The querysets use placeholder ids and paths, which plans don't depend on.
+    """
+    category = CategoryPage(pk=1)
+    hub = CarHubPage(path="000100010001", depth=3)
+    return [
+        (
+            "Category listing, first page",
+            category.posts_after()[:13],
+            [BlogPage._meta.db_table],
+            True,
+        ),
+        (
+            "Category listing, next page",
+            category.posts_after(f"2024-01-01.{2 ** 31}")[:12],
+            [BlogPage._meta.db_table],
+            True,
+        ),
+        (
+            # A hub has few categories, sorting them is cheaper than reading
+            # every category in date order.
+            "Car hub categories",
+            hub.categories(),
+            [Page._meta.db_table, CategoryPage._meta.db_table],
+            False,
+        ),
+        (
+            "Approved comments",
+            BlogComment.objects.filter(page_id=1, is_approved=True).order_by(
+                "created_at"
+            ),
+            [BlogComment._meta.db_table],
+            True,
+        ),
+    ]
+
+
+def sqlite_plan(cursor, sql, params, tables):
+    """
+    Return the plan, whether it scans any of ``tables`` rather than searching
+    an index and whether it sorts the rows itself.
+    """
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    plan = [row[3] for row in cursor.fetchall()]
+    # e.g. "SCAN blog_blogpage" or "SCAN blog_blogpage USING INDEX ..." read
+    # every row, as opposed to "SEARCH blog_blogpage USING INDEX ... (...=?)".
+    scans = [
+        step
+        for step in plan
+        if step.split(" ")[0] == "SCAN" and step.split(" ")[1] in tables
+    ]
+    sorts = "USE TEMP B-TREE FOR ORDER BY" in plan
+    return "\n".join(plan), bool(scans), sorts
+
+
+def postgresql_plan(cursor, sql, params, tables):
+    """
+    Return the plan, whether it scans any of ``tables`` without an index
+    condition and whether it sorts the rows itself.
+    """
+    # Sequential scans win on small tables whatever the indexes, so disable
+    # them: a sequential scan left in the plan means no index could serve it.
+    cursor.execute("SET LOCAL enable_seqscan = off")
+    cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    def nodes(node):
+        yield node
+        for child in node.get("Plans", []):
+            yield from nodes(child)
+
+    # Index scans without a condition read the whole index.
+    scans = any(
+        node.get("Relation Name") in tables
+        and (
+            node["Node Type"] == "Seq Scan"
+            or (
+                node["Node Type"] in ("Index Scan", "Index Only Scan")
+                and "Index Cond" not in node
+            )
+        )
+        for node in nodes(plan[0]["Plan"])
+    )
+    sorts = any(node["Node Type"] == "Sort" for node in nodes(plan[0]["Plan"]))
+    return json.dumps(plan, indent=2), scans, sorts
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the hot listing queries and fail if any of them reads one of "
+        "its tables with a full scan, of the table or of an index, or sorts "
+        "rows its index should return in order. Supports SQLite and "
+        "PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verbose-plans",
+            action="store_true",
+            help="Print every plan, not only the failing ones.",
+        )
+
+    def handle(self, *args, **options):
+        explain = {
+            "sqlite": sqlite_plan,
+            "postgresql": postgresql_plan,
+        }.get(connection.vendor)
+        if explain is None:
+            raise CommandError(f"Unsupported database: {connection.vendor}.")
+
+        failed = []
+        for name, queryset, tables, ordered in hot_queries():
+            sql, params = queryset.query.sql_with_params()
+            with transaction.atomic(), connection.cursor() as cursor:
+                plan, full_scan, sorts = explain(cursor, sql, params, tables)
+
+            if full_scan:
+                status = "FULL SCAN"
+            elif ordered and sorts:
+                status = "SORTED WITHOUT INDEX"
+            else:
+                status = "ok"
+            self.stdout.write(f"{status}: {name}")
+            if status != "ok" or options["verbose_plans"]:
+                self.stdout.write(plan)
+            if status != "ok":
+                failed.append(name)
+
+        if failed:
+            raise CommandError(
+                f"{len(failed)} hot queries lost their index: "
+                f"{', '.join(failed)}"
+            )
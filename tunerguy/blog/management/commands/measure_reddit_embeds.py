@@ -0,0 +1,99 @@
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+
+import requests
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory, override_settings
+
+from tunerguy.blog.models import CarHubPage, RedditEmbed
+
+
+class ResourceParser(HTMLParser):
+    """Collects the URLs of the scripts, images, stylesheets and frames of a page."""
+
+    def __init__(self):
+        super().__init__()
+        self.resources = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in ("script", "img", "iframe") and attrs.get("src"):
+            self.resources.append(attrs["src"])
+        elif tag == "link" and attrs.get("rel") == "stylesheet":
+            self.resources.append(attrs["href"])
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the weight and external requests of a CarHubPage with its "
+        "Reddit posts rendered as widgets and as server-rendered cards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page",
+            type=int,
+            help="Id of the CarHubPage, defaults to the first with an embed.",
+        )
+        parser.add_argument(
+            "--fetch",
+            action="store_true",
+            help="Download the external resources to include their weight.",
+        )
+
+    def handle(self, *args, **options):
+        pages = CarHubPage.objects.live().filter(reddit_embeds__isnull=False)
+        if options["page"]:
+            pages = pages.filter(pk=options["page"])
+        page = pages.first()
+        if page is None:
+            raise CommandError("No live CarHubPage with a Reddit embed found.")
+        if not page.reddit_embeds.posts:
+            raise CommandError("The page's Reddit embed has no posts yet.")
+
+        self.stdout.write(f"{page.title} (r/{page.reddit_embeds.subreddit})")
+        for render_mode, label in RedditEmbed.RENDER_MODE_CHOICES:
+            # Only the in-memory embed is switched, nothing is saved.
+            page.reddit_embeds.render_mode = render_mode
+            self.report(label, self.render(page), options["fetch"])
+
+    def render(self, page):
+        request = RequestFactory().get(page.url)
+        request.user = AnonymousUser()
+        # A cached response would be the other render mode's, and caching this
+        # one would serve the switched embed to readers.
+        with override_settings(PAGE_CACHE_ENABLED=False):
+            response = page.serve(request)
+            response.render()
+        return response.content.decode()
+
+    def report(self, label, html, fetch):
+        parser = ResourceParser()
+        parser.feed(html)
+        external = [
+            url for url in parser.resources if urlsplit(url).netloc != ""
+        ]
+        # widgets.js replaces every blockquote with an iframe loaded from Reddit.
+        widget_frames = html.count('class="reddit-card"')
+
+        line = (
+            f"  {label}: {len(html.encode()):,} bytes of HTML, "
+            f"{len(parser.resources)} resources, {len(external)} external"
+        )
+        if widget_frames:
+            line += f" (+{widget_frames} iframes added by widgets.js)"
+        if fetch:
+            line += f", {self.fetch_weight(external):,} bytes of external resources"
+        self.stdout.write(line)
+
+    def fetch_weight(self, urls):
+        weight = 0
+        for url in urls:
+            if url.startswith("//"):
+                url = f"https:{url}"
+            try:
+                weight += len(requests.get(url, timeout=10).content)
+            except requests.RequestException as exc:
+                self.stderr.write(f"  Failed to fetch {url}: {exc}")
+        return weight
@@ -0,0 +1,64 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tunerguy.blog.models import CategoryLatestPost, CategoryPage
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the denormalized latest posts of every category, or with "
+        "--check, report the categories whose latest posts are out of date."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only compare, exit with an error if anything is out of date.",
+        )
+
+    def handle(self, *args, **options):
+        category_ids = CategoryPage.objects.values_list("pk", flat=True)
+
+        if not options["check"]:
+            for category_id in category_ids:
+                CategoryLatestPost.rebuild(category_id)
+            self.stdout.write(f"Rebuilt {len(category_ids)} categories.")
+            return
+
+        stored = {}
+        for latest_post in CategoryLatestPost.objects.all():
+            stored.setdefault(latest_post.category_id, []).append(
+                self.card(latest_post)
+            )
+
+        stale = []
+        for category_id in category_ids:
+            expected = [
+                self.card(latest_post)
+                for latest_post in CategoryLatestPost.expected(category_id)
+            ]
+            if stored.get(category_id, []) != expected:
+                stale.append(category_id)
+                self.stdout.write(f"Category {category_id} is out of date.")
+
+        if stale:
+            raise CommandError(
+                f"{len(stale)} of {len(category_ids)} categories are out of "
+                "date, run rebuild_latest_posts to fix them."
+            )
+        self.stdout.write(
+            f"All {len(category_ids)} categories are up to date."
+        )
+
+    @staticmethod
+    def card(latest_post):
+        return (
+            latest_post.rank,
+            latest_post.post_id,
+            latest_post.title,
+            latest_post.url_path,
+            latest_post.snippet,
+            latest_post.featured_image.name,
+            latest_post.author_name,
+            latest_post.date,
+        )
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tunerguy.base.circuit_breaker import CircuitBreaker
+from tunerguy.base.reddit_api import breaker_states
+from tunerguy.blog.models import RedditEmbed
+
+
+class Command(BaseCommand):
+    help = "Show the circuit breaker state of every RedditEmbed subreddit."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fail-on-open",
+            action="store_true",
+            help="Exit with an error if any breaker is open, for alerting.",
+        )
+
+    def handle(self, *args, **options):
+        states = breaker_states(
+            RedditEmbed.objects.values_list("subreddit", flat=True)
+        )
+        for subreddit, state in states.items():
+            self.stdout.write(
+                f"r/{subreddit}: {state['status']}, "
+                f"{state['failures']} consecutive failures"
+                + (
+                    f", last error {state['last_error']}"
+                    if state["failures"]
+                    else ""
+                )
+            )
+
+        open_breakers = [
+            subreddit
+            for subreddit, state in states.items()
+            if state["status"] == CircuitBreaker.OPEN
+        ]
+        if open_breakers and options["fail_on_open"]:
+            raise CommandError(
+                f"Open circuit breakers: {', '.join(open_breakers)}"
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from tunerguy.blog.models import CategoryPage
+
+
+class Command(BaseCommand):
+    help = (
+        "Set every category's date_of_last_post to the date of its latest "
+        "live post, e.g. after a bulk import."
+    )
+
+    def handle(self, *args, **options):
+        updated = CategoryPage.refresh_date_of_last_post()
+        self.stdout.write(f"Refreshed {updated} categories.")
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0035_alter_blogindexpage_featured_cars_and_more"),
+    ]
+
+    operations = [
+        # Existing embeds were validated against Reddit when they were saved.
+        migrations.AddField(
+            model_name="redditembed",
+            name="subreddit_status",
+            field=models.CharField(
+                choices=[
+                    ("verified", "Verified"),
+                    ("pending", "Pending verification"),
+                    ("not_found", "Not found"),
+                ],
+                default="verified",
+                editable=False,
+                max_length=10,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="redditembed",
+            name="subreddit_status",
+            field=models.CharField(
+                choices=[
+                    ("verified", "Verified"),
+                    ("pending", "Pending verification"),
+                    ("not_found", "Not found"),
+                ],
+                default="pending",
+                editable=False,
+                max_length=10,
+            ),
+        ),
+    ]
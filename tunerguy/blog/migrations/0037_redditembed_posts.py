@@ -0,0 +1,47 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:44
+
+import re
+
+from django.db import migrations, models
+
+EMBED_CODE = re.compile(
+    r'<a href="https://www\.reddit\.com(?P<permalink>/r/[^/]+/comments/'
+    r'(?P<id>[^/]+)/[^"]*)">(?P<title>.*?)</a><br> by'
+    r'<a href="https://www\.reddit\.com/user/(?P<author>[^"]+)">.*?</a> in '
+    r'<a href="[^"]*">(?P<subreddit>[^<]+)</a></blockquote>'
+)
+
+
+def embed_codes_to_posts(apps, schema_editor):
+    # Recover the posts from the stored embed codes so embeds keep rendering
+    # until their next refresh. The score wasn't stored and is left empty.
+    RedditEmbed = apps.get_model("blog", "RedditEmbed")
+    for reddit_embed in RedditEmbed.objects.exclude(_embed_codes=None):
+        posts = []
+        for embed_code in reddit_embed._embed_codes.split("|"):
+            match = EMBED_CODE.search(embed_code)
+            if match:
+                posts.append(
+                    {**match.groupdict(), "score": None, "fetched_at": None}
+                )
+        reddit_embed.posts = posts
+        reddit_embed.save(update_fields=["posts"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0036_redditembed_subreddit_status"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="redditembed",
+            name="posts",
+            field=models.JSONField(blank=True, default=list, editable=False),
+        ),
+        migrations.RunPython(embed_codes_to_posts, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name="redditembed",
+            name="_embed_codes",
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0037_redditembed_posts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="redditembed",
+            name="last_changed_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="redditembed",
+            name="last_fetched_at",
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="redditembed",
+            name="posts_fingerprint",
+            field=models.CharField(blank=True, editable=False, max_length=40),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0038_redditembed_fingerprint"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="redditembed",
+            name="next_refresh_at",
+            field=models.DateTimeField(
+                db_index=True, editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="redditembed",
+            name="refresh_interval",
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0039_redditembed_refresh_schedule"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="redditembed",
+            name="render_mode",
+            field=models.CharField(
+                choices=[
+                    ("widget", "Reddit widget"),
+                    ("card", "Server-rendered card"),
+                ],
+                default="widget",
+                help_text="Cards load faster; widgets are rendered by Reddit.",
+                max_length=6,
+            ),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.30 on 2026-10-17 17:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_latest_posts(apps, schema_editor):
+    BlogPage = apps.get_model("blog", "BlogPage")
+    CategoryLatestPost = apps.get_model("blog", "CategoryLatestPost")
+    category_ids = (
+        BlogPage.objects.filter(live=True)
+        .exclude(category=None)
+        .values_list("category_id", flat=True)
+        .distinct()
+    )
+    latest_posts = []
+    for category_id in category_ids:
+        posts = (
+            BlogPage.objects.filter(live=True, category_id=category_id)
+            .select_related("author")
+            .order_by("-date", "-pk")[: settings.CATEGORY_LATEST_POSTS]
+        )
+        latest_posts += [
+            CategoryLatestPost(
+                category_id=category_id,
+                rank=rank,
+                post_id=post.pk,
+                title=post.title,
+                url_path=post.url_path,
+                snippet=post.snippet,
+                featured_image=post.featured_image.name,
+                author_name=" ".join(
+                    [post.author.first_name, post.author.last_name]
+                ).strip(),
+                date=post.date,
+            )
+            for rank, post in enumerate(posts)
+        ]
+    CategoryLatestPost.objects.bulk_create(latest_posts)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0040_redditembed_render_mode"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryLatestPost",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("title", models.CharField(max_length=255)),
+                ("url_path", models.TextField()),
+                ("snippet", models.CharField(max_length=200)),
+                (
+                    "featured_image",
+                    models.ImageField(upload_to="featured_image/%Y/%m/%d/"),
+                ),
+                ("author_name", models.CharField(max_length=300)),
+                ("date", models.DateField()),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="latest_posts",
+                        to="blog.categorypage",
+                    ),
+                ),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="blog.blogpage",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["category", "rank"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="categorylatestpost",
+            constraint=models.UniqueConstraint(
+                fields=("category", "rank"), name="unique_category_rank"
+            ),
+        ),
+        migrations.RunPython(fill_latest_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.30 on 2026-10-17 18:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0041_categorylatestpost"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="blogcomment",
+            index=models.Index(
+                condition=models.Q(("is_approved", True)),
+                fields=["page", "created_at"],
+                name="comment_approved_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="blogpage",
+            index=models.Index(
+                fields=["category", "-date", "-page_ptr"],
+                name="blogpage_category_date_idx",
+            ),
+        ),
+    ]
@@ -1,25 +1,47 @@
-from datetime import date
+import hashlib
+import json
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
 
 from django.conf import settings
 from django.core.validators import MinLengthValidator
-from django.db import models
-from django.db.models import Prefetch
+from django.db import models, transaction
+from django.db.models import (
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+)
+from django.http import Http404, JsonResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
 from modelcluster.contrib.taggit import ClusterTaggableManager
 from modelcluster.fields import ParentalKey
 from taggit.models import TaggedItemBase
 from wagtail.admin.panels import FieldPanel, MultiFieldPanel
+from wagtail.contrib.routable_page.models import RoutablePageMixin, path
 from wagtail.fields import RichTextField, StreamField
 from wagtail.models import Page
 from wagtail.snippets.models import register_snippet
 
+from tunerguy.base import page_cache
 from tunerguy.base.blocks import (
     ContentStreamBlock,
     FeaturedContentBlock,
     ResourceStreamBlock,
     YoutubeEmbedBlock,
 )
-from tunerguy.base.reddit_api import get_reddit_posts
+from tunerguy.base.navigation import breadcrumbs, page_urls
+from tunerguy.base.page_cache import CachedPageMixin
+from tunerguy.base.reddit_api import (
+    cached_subreddit_found,
+    get_reddit_posts,
+    store_thumbnails,
+)
 
+from .cards import ArticleCard, blog_page_values
 from .validators import validate_subreddit_exists, validate_subreddit_format
 
 # -----------------------------------------------------------------------------
@@ -91,7 +113,7 @@ class BlogIndexPage(Page):
     subpage_types = ["CarHubPage", "CategoryPage"]
 
 
-class CarHubPage(BaseCategory):
+class CarHubPage(CachedPageMixin, BaseCategory):
     """
     Represents a type of Category Page for a specific car.
 
@@ -124,51 +146,76 @@ class CarHubPage(BaseCategory):
     parent_page_types = ["BlogIndexPage"]
     subpage_types = ["CategoryPage"]
 
-    def get_context(self, request, *args, **kwargs):
-        context = super().get_context(request)
-
-        blog_page_query = (
-            BlogPage.objects.select_related(
-                "author",
+    def categories(self):
+        """
+        Return the hub's live categories, latest post first.
+
+        Children are selected on a range of paths, as treebeard's
+        ``get_children`` does, which seeks the path index. The prefix match of
+        ``child_of`` can't, so every category would be scanned.
+        """
+        return (
+            CategoryPage.objects.filter(
+                path__range=self._get_children_path_interval(self.path),
+                depth=self.depth + 1,
             )
             .live()
-            .only(
-                "snippet",
-                "title",
-                "date",
-                "featured_image",
-                "author__first_name",
-                "author__last_name",
-                "url_path",
-                "page_ptr_id",
-                "category_id",
-            )
-            .order_by("-date")[:3]
+            .order_by("-date_of_last_post")
         )
 
-        categories = (
-            CategoryPage.objects.descendant_of(self)
-            .live()
-            .order_by("-date_of_last_post")
-            .only("title", "url_path")
-            .prefetch_related(
-                Prefetch(
-                    "category_posts",
-                    queryset=blog_page_query,
-                    to_attr="posts",
-                )
-            )
+    def get_context(self, request, *args, **kwargs):
+        context = super().get_context(request)
+
+        categories = list(self.categories().values("pk", "title", "url_path"))
+        rows = list(
+            CategoryLatestPost.objects.filter(
+                category_id__in=[category["pk"] for category in categories]
+            ).values("category_id", *ArticleCard.FIELDS)
         )
+        posts = defaultdict(list)
+        for row, card in zip(rows, ArticleCard.from_rows(rows)):
+            posts[row["category_id"]].append(card)
+        urls = page_urls(category["url_path"] for category in categories)
+        for category in categories:
+            category["url"] = urls[category["url_path"]]
+            category["posts"] = posts[category["pk"]]
 
         context["categories"] = categories
         context["reddit_embeds"] = (
-            self.reddit_embeds.embed_codes if self.reddit_embeds else []
+            self.reddit_embeds.rotated_posts() if self.reddit_embeds else []
+        )
+        page_cache.depends_on(
+            page_cache.descendants_key(self), self.reddit_embeds
         )
 
         return context
 
 
-class CategoryPage(BaseCategory):
+class CategoryPage(CachedPageMixin, RoutablePageMixin, BaseCategory):
+    """
+    Lists the posts of a category, latest first.
+
+    The page renders the latest post and a first page of posts; following pages
+    are loaded from ``posts_page`` as the reader scrolls. Pages are keyset
+    paginated on (date, id), so each one is a single indexed range read however
+    many posts the category has.
+
+    Attributes:
+        date_of_last_post (DateField): Date of the category's latest live
+            post, used to order categories. Kept up to date by
+            ``refresh_date_of_last_post`` when posts are published,
+            unpublished or deleted.
+
+    Methods:
+        - refresh_date_of_last_post(category_ids=None): Recomputes
+          ``date_of_last_post`` in a single update.
+        - posts_after(cursor=None): Returns the posts after a cursor.
+        - paginate_posts(cursor=None, size=None): Returns a page of posts and
+          the cursor of the next one.
+        - posts_page(request): Route serving the next page of posts as HTML or
+          JSON.
+    """
+
     date_of_last_post = models.DateField(null=True, blank=True)
 
     parent_page_types = ["BlogIndexPage", "CarHubPage"]
@@ -178,36 +225,151 @@ class CategoryPage(BaseCategory):
         FieldPanel("intro"),
     ]
 
+    @classmethod
+    def refresh_date_of_last_post(cls, category_ids=None):
+        """
+        Set ``date_of_last_post`` to the date of each category's latest live
+        post, in a single ``UPDATE`` that touches nothing else.
+
+        Args:
+            category_ids (iterable): The categories to refresh, defaults to all.
+
+        Returns:
+            int: The number of categories updated.
+        """
+        categories = cls.objects.all()
+        if category_ids is not None:
+            categories = categories.filter(pk__in=category_ids)
+        latest = (
+            BlogPage.objects.live()
+            .filter(category=OuterRef("pk"))
+            .order_by()
+            .values("category")
+            .annotate(latest=Max("date"))
+            .values("latest")
+        )
+        return categories.update(date_of_last_post=Subquery(latest))
+
+    @staticmethod
+    def encode_cursor(post):
+        return f"{post.date.isoformat()}.{post.pk}"
+
+    @staticmethod
+    def decode_cursor(cursor):
+        """Return the date and id in ``cursor``, raising ``Http404`` if invalid."""
+        try:
+            post_date, post_id = cursor.split(".")
+            return date.fromisoformat(post_date), int(post_id)
+        except ValueError:
+            raise Http404("Invalid cursor.")
+
+    def posts_after(self, cursor=None):
+        """
+        Return the category's live posts after ``cursor``, latest first.
+
+        Args:
+            cursor (str): A cursor returned by ``paginate_posts``. Defaults to
+                the start of the listing.
+
+        Returns:
+            QuerySet: The posts' card fields, see ``blog_page_values``.
+        """
+        posts = blog_page_values(
+            BlogPage.objects.live()
+            .filter(category=self)
+            .order_by("-date", "-pk")
+        )
+        if cursor is not None:
+            post_date, post_id = self.decode_cursor(cursor)
+            # The date bound alone lets the (category, date) index seek; the
+            # OR only breaks ties within the cursor's date.
+            posts = posts.filter(date__lte=post_date).filter(
+                Q(date__lt=post_date) | Q(date=post_date, pk__lt=post_id)
+            )
+        return posts
+
+    def paginate_posts(self, cursor=None, size=None):
+        """
+        Return a page of the category's live posts, latest first.
+
+        Args:
+            cursor (str): The cursor of the page, as returned with the previous
+                page. Defaults to the first page.
+            size (int): Number of posts, defaults to ``CATEGORY_PAGE_SIZE``.
+
+        Returns:
+            tuple: The posts' ``ArticleCard``'s and the cursor of the next page,
+            ``None`` if this is the last page.
+        """
+        size = size or settings.CATEGORY_PAGE_SIZE
+        # One extra post tells whether there's a next page.
+        posts = ArticleCard.from_rows(self.posts_after(cursor)[: size + 1])
+        next_cursor = (
+            self.encode_cursor(posts[size - 1]) if len(posts) > size else None
+        )
+        return posts[:size], next_cursor
+
     def get_context(self, request, *args, **kwargs):
         context = super().get_context(request)
 
-        posts = (
-            BlogPage.objects.descendant_of(self)
-            .select_related(
-                "author",
-            )
-            .live()
-            .order_by("-date")
-            .only(
-                "snippet",
-                "title",
-                "date",
-                "featured_image",
-                "author__first_name",
-                "author__last_name",
-                "url_path",
-                "page_ptr_id",
-                "category_id",
-            )
+        # The latest post is featured, the rest make up the first page.
+        posts, next_cursor = self.paginate_posts(
+            size=settings.CATEGORY_PAGE_SIZE + 1
         )
-
-        context["latest_post"] = posts[0]
-        context["posts"] = posts[1::]
+        context["latest_post"] = posts[0] if posts else None
+        context["posts"] = posts[1:]
+        context["next_posts_url"] = self.next_posts_url(next_cursor)
+        page_cache.depends_on(page_cache.descendants_key(self))
 
         return context
 
+    def next_posts_url(self, cursor):
+        if cursor is None:
+            return None
+        return (
+            f"{self.url}{self.reverse_subpage('posts_page')}?cursor={cursor}"
+        )
 
-class BlogPage(Page):
+    @path("posts/")
+    def posts_page(self, request):
+        """
+        Serve the page of posts after ``?cursor=``, as JSON with
+        ``?format=json`` or else as an HTML fragment for the infinite scroll.
+        """
+        cursor = request.GET.get("cursor")
+        if not cursor:
+            raise Http404("Missing cursor.")
+        posts, next_cursor = self.paginate_posts(cursor)
+        page_cache.depends_on(page_cache.descendants_key(self))
+
+        if request.GET.get("format") == "json":
+            return JsonResponse(
+                {
+                    "posts": [
+                        {
+                            "title": post.title,
+                            "url": post.url,
+                            "snippet": post.snippet,
+                            "featured_image": post.image_url,
+                            "author": post.author_name,
+                            "date": post.date.isoformat(),
+                        }
+                        for post in posts
+                    ],
+                    "next": next_cursor,
+                }
+            )
+        return TemplateResponse(
+            request,
+            "blog/includes/article_page.html",
+            {
+                "posts": posts,
+                "next_posts_url": self.next_posts_url(next_cursor),
+            },
+        )
+
+
+class BlogPage(CachedPageMixin, Page):
     category = models.ForeignKey(
         CategoryPage,
         blank=True,
@@ -242,18 +404,137 @@ class BlogPage(Page):
         FieldPanel("body"),
     ]
 
+    class Meta:
+        indexes = [
+            # Category listings are keyset paginated on (date, id).
+            models.Index(
+                fields=["category", "-date", "-page_ptr"],
+                name="blogpage_category_date_idx",
+            ),
+        ]
+
     parent_page_types = ["CategoryPage"]
     subpage_types = []
 
+    def get_context(self, request, *args, **kwargs):
+        context = super().get_context(request)
+        context["breadcrumbs"] = breadcrumbs(self)
+        # The breadcrumbs show the ancestors' titles.
+        page_cache.depends_on(
+            *(Page(pk=crumb["id"]) for crumb in context["breadcrumbs"])
+        )
+        return context
+
+    @property
+    def author_name(self):
+        return self.author.get_full_name()
+
+    @property
+    def image_url(self):
+        return self.featured_image.url
+
     def save(self, clean=True, user=None, log_action=False, **kwargs):
-        parent_category = self.get_parent().specific
-        parent_category.date_of_last_post = date.today()
-        self.category = parent_category
-        parent_category.save()
+        # The category's date_of_last_post is refreshed when the post is
+        # published, unpublished or deleted, see tunerguy.blog.signals.
+        self.category_id = self.get_parent().pk
 
         return super().save(clean, user, log_action, **kwargs)
 
 
+class CategoryLatestPost(models.Model):
+    """
+    The latest live ``BlogPage``'s of a ``CategoryPage``, with the fields of
+    their preview card.
+
+    Denormalized so ``CarHubPage`` renders the latest posts of all its categories
+    from one indexed read. Kept up to date by the signal handlers in
+    ``tunerguy.blog.signals`` when a post is published, unpublished or deleted.
+
+    Attributes:
+        category (ForeignKey): The category the post is listed in.
+        rank (PositiveSmallIntegerField): The post's position, 0 being the latest.
+        post (ForeignKey): The listed post.
+        title, url_path, snippet, featured_image, author_name, date: Copies of
+            the post's card fields.
+
+    Methods:
+        - rebuild(category_id): Recomputes the latest posts of a category.
+        - expected(category_id): Returns the latest posts a category should list.
+    """
+
+    category = models.ForeignKey(
+        CategoryPage,
+        related_name="latest_posts",
+        on_delete=models.CASCADE,
+    )
+    rank = models.PositiveSmallIntegerField()
+    post = models.ForeignKey(
+        BlogPage,
+        related_name="+",
+        on_delete=models.CASCADE,
+    )
+    title = models.CharField(max_length=255)
+    url_path = models.TextField()
+    snippet = models.CharField(max_length=200)
+    featured_image = models.ImageField(upload_to="featured_image/%Y/%m/%d/")
+    author_name = models.CharField(max_length=300)
+    date = models.DateField()
+
+    class Meta:
+        ordering = ["category", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["category", "rank"], name="unique_category_rank"
+            )
+        ]
+
+    @classmethod
+    def expected(cls, category_id):
+        """
+        Return the latest posts ``category_id`` should list, unsaved.
+
+        Returns:
+            list: ``CategoryLatestPost`` instances, ranked.
+        """
+        posts = (
+            BlogPage.objects.live()
+            .filter(category_id=category_id)
+            .select_related("author")
+            .only(
+                "title",
+                "url_path",
+                "snippet",
+                "featured_image",
+                "date",
+                "author__first_name",
+                "author__last_name",
+            )
+            .order_by("-date", "-pk")[: settings.CATEGORY_LATEST_POSTS]
+        )
+        return [
+            cls(
+                category_id=category_id,
+                rank=rank,
+                post=post,
+                title=post.title,
+                url_path=post.url_path,
+                snippet=post.snippet,
+                featured_image=post.featured_image.name,
+                author_name=post.author_name,
+                date=post.date,
+            )
+            for rank, post in enumerate(posts)
+        ]
+
+    @classmethod
+    def rebuild(cls, category_id):
+        """Replace the listed posts of ``category_id`` with the latest ones."""
+        with transaction.atomic():
+            cls.objects.filter(category_id=category_id).delete()
+            if CategoryPage.objects.filter(pk=category_id).exists():
+                cls.objects.bulk_create(cls.expected(category_id))
+
+
 class BlogPageTag(TaggedItemBase):
     """
     Attaches tagging to ``BlogPage``.
@@ -298,6 +579,16 @@ class BlogComment(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     is_approved = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Only approved comments are shown, oldest first.
+            models.Index(
+                fields=["page", "created_at"],
+                condition=models.Q(is_approved=True),
+                name="comment_approved_idx",
+            ),
+        ]
+
     panels = [
         FieldPanel("page"),
         FieldPanel("text"),
@@ -311,50 +602,284 @@ class RedditEmbed(models.Model):
     """
     Represents a Reddit embed snippet used on ``CategoryPage`` and ``CarHubPage``.
 
-    Uses function, ``get_reddit_posts``, to get and store the embed code
-    for two reddit posts.
+    Uses function, ``get_reddit_posts``, to get and store the fields of a
+    ranked pool of reddit posts. ``REDDIT_POSTS_SHOWN`` of them are shown at a
+    time, rotating through the pool every ``REDDIT_ROTATION_WINDOW`` seconds.
+    Depending on ``render_mode`` they're rendered by the cached
+    "blog/includes/reddit_post_embeds.html" fragment, as blockquotes Reddit's
+    widgets.js turns into embeds, or by "blog/includes/reddit_post_cards.html",
+    as cards rendered entirely server side.
 
     Attributes:
         title (CharField): The title or name of the embed.
         subreddit (CharField): The subreddit associated with the embed.
             As "mysubreddit". Not "/r/mysubreddit". This should be provided without
             the "/r/" prefix, only the subreddit name.
-        _embed_codes (TextField): Stores the embed codes as a delimited string.
+        posts (JSONField): The fetched pool of posts, ranked: id, title, author,
+            permalink, score, subreddit and fetch time.
+        posts_fingerprint (CharField): Hash of the set of ids of the stored
+            posts.
+        last_fetched_at (DateTimeField): When posts were last fetched from Reddit.
+        last_changed_at (DateTimeField): When the fetched posts last differed from
+            the stored ones.
+        subreddit_status (CharField): Whether the subreddit was confirmed to exist.
+            Embeds whose subreddit couldn't be checked in time when saved are
+            pending until ``verify_pending_subreddits`` confirms them.
+        refresh_interval (PositiveIntegerField): Seconds between refreshes,
+            adapted to how often the subreddit's top posts change.
+        next_refresh_at (DateTimeField): When the embed is next due a refresh.
+            Embeds never fetched are due immediately.
+        render_mode (CharField): Whether posts are shown as Reddit widgets or as
+            server-rendered cards, which load nothing from Reddit.
 
     Properties:
-        - embed_codes (list): Returns the embed codes as a list.
+        - post_ids (list): Returns the ids of the stored posts.
+        - posts_version (str): Returns a key identifying the stored posts.
+        - rotation_window (int): Returns the number of the current rotation window.
+        - uses_widgets (bool): Returns whether pages need Reddit's widgets.js.
 
     Methods:
-        - save(*args, **kwargs): Overrides the default save method to fetch and store
+        - rotated_posts(window=None): Returns the posts shown during a rotation
+          window.
+        - set_posts(posts): Stores freshly fetched posts, returning whether
+          they changed.
+        - reuse_shared_posts(): Stores the posts of another embed for the same
+          subreddit, if any.
+        - schedule_refresh(changed): Adapts the refresh interval and sets the
+          next refresh time.
+        - save(*args, **kwargs): Overrides the default save method to queue fetching
           the top Reddit posts for the specified subreddit upon creation.
     """
 
+    VERIFIED = "verified"
+    PENDING = "pending"
+    NOT_FOUND = "not_found"
+    SUBREDDIT_STATUS_CHOICES = [
+        (VERIFIED, "Verified"),
+        (PENDING, "Pending verification"),
+        (NOT_FOUND, "Not found"),
+    ]
+
+    WIDGET = "widget"
+    CARD = "card"
+    RENDER_MODE_CHOICES = [
+        (WIDGET, "Reddit widget"),
+        (CARD, "Server-rendered card"),
+    ]
+
     title = models.CharField(max_length=20)
     subreddit = models.CharField(
         max_length=15,
         validators=[validate_subreddit_format, validate_subreddit_exists],
     )
-    _embed_codes = models.TextField(blank=True, null=True)
+    posts = models.JSONField(default=list, blank=True, editable=False)
+    posts_fingerprint = models.CharField(
+        max_length=40, blank=True, editable=False
+    )
+    last_fetched_at = models.DateTimeField(null=True, editable=False)
+    last_changed_at = models.DateTimeField(null=True, editable=False)
+    subreddit_status = models.CharField(
+        max_length=10,
+        choices=SUBREDDIT_STATUS_CHOICES,
+        default=PENDING,
+        editable=False,
+    )
+    refresh_interval = models.PositiveIntegerField(null=True, editable=False)
+    next_refresh_at = models.DateTimeField(
+        null=True, db_index=True, editable=False
+    )
+    render_mode = models.CharField(
+        max_length=6,
+        choices=RENDER_MODE_CHOICES,
+        default=WIDGET,
+        help_text="Cards load faster; widgets are rendered by Reddit.",
+    )
 
     panels = [
         FieldPanel("title"),
         FieldPanel("subreddit"),
+        FieldPanel("render_mode"),
     ]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_subreddit = instance.__dict__.get("subreddit")
+        return instance
+
+    @property
+    def post_ids(self):
+        """Return the ids of the stored posts."""
+        return [post["id"] for post in self.posts]
+
+    @property
+    def posts_version(self):
+        """Return a key identifying the stored posts, used to cache their HTML."""
+        # Rankings, scores and thumbnails change without changing the
+        # fingerprint. Fetch times aren't shown, so they're left out.
+        shown = [
+            {key: value for key, value in post.items() if key != "fetched_at"}
+            for post in self.posts
+        ]
+        content = json.dumps(shown, sort_keys=True)
+        return hashlib.sha1(content.encode()).hexdigest()
+
+    @property
+    def rotation_window(self):
+        """Return the number of the current rotation window."""
+        return int(time.time() // settings.REDDIT_ROTATION_WINDOW)
+
     @property
-    def embed_codes(self):
-        """Return embed codes as a list."""
-        return self._embed_codes.split("|")
+    def uses_widgets(self):
+        """Return whether pages showing the posts need Reddit's widgets.js."""
+        return self.render_mode == self.WIDGET
+
+    def rotated_posts(self, window=None):
+        """
+        Return the ``REDDIT_POSTS_SHOWN`` posts shown during a rotation window.
+
+        Consecutive windows step through the ranked pool, wrapping around, so
+        every stored post gets shown without fetching more from Reddit.
+
+        Args:
+            window (int): The rotation window, defaults to the current one.
+
+        Returns:
+            list: The posts to show.
+        """
+        if window is None:
+            window = self.rotation_window
+        shown = settings.REDDIT_POSTS_SHOWN
+        if len(self.posts) <= shown:
+            return self.posts
+        start = window * shown % len(self.posts)
+        return [
+            self.posts[(start + offset) % len(self.posts)]
+            for offset in range(shown)
+        ]
+
+    @staticmethod
+    def fingerprint(posts):
+        """
+        Return a hash of the set of ids of ``posts``.
+
+        The ranking of a hot listing shifts on nearly every fetch, so only posts
+        entering or leaving the pool count as a change.
+        """
+        post_ids = ",".join(sorted(post["id"] for post in posts))
+        return hashlib.sha1(post_ids.encode()).hexdigest()
+
+    def set_posts(self, posts):
+        """
+        Store freshly fetched ``posts``.
+
+        They're stored even if their ids didn't change, for their new ranking,
+        scores and thumbnails, but only posts entering or leaving the pool
+        count as a change, see ``fingerprint``.
+
+        Returns:
+            bool: True if the set of posts changed.
+        """
+        now = timezone.now()
+        self.last_fetched_at = now
+        self.posts = posts
+        fingerprint = self.fingerprint(posts)
+        if fingerprint == self.posts_fingerprint:
+            return False
+
+        self.posts_fingerprint = fingerprint
+        self.last_changed_at = now
+        return True
+
+    def schedule_refresh(self, changed):
+        """
+        Adapt ``refresh_interval`` to the subreddit's post velocity and set
+        ``next_refresh_at``.
+
+        The interval is halved when a refresh found new posts and doubled when it
+        didn't, within ``REDDIT_REFRESH_MIN_INTERVAL`` and
+        ``REDDIT_REFRESH_MAX_INTERVAL``. Busy subreddits converge on frequent
+        refreshes, quiet ones on rare ones.
+
+        Args:
+            changed (bool): Whether the last refresh changed the posts.
+        """
+        interval = (
+            self.refresh_interval or settings.REDDIT_REFRESH_MAX_INTERVAL
+        )
+        interval = interval // 2 if changed else interval * 2
+        self.refresh_interval = max(
+            settings.REDDIT_REFRESH_MIN_INTERVAL,
+            min(interval, settings.REDDIT_REFRESH_MAX_INTERVAL),
+        )
+        # Jitter keeps embeds refreshed together from staying in lockstep.
+        self.next_refresh_at = timezone.now() + timedelta(
+            seconds=self.refresh_interval * random.uniform(0.9, 1.1)
+        )
 
     def update_embedded_posts(self):
-        embeds = get_reddit_posts(self.subreddit)
-        self._embed_codes = "|".join(embeds)
+        posts = get_reddit_posts(self.subreddit)
+        store_thumbnails(posts)
+        return self.set_posts(posts)
+
+    def shared_posts(self):
+        """Return the posts of another embed for the same subreddit, if any."""
+        return (
+            RedditEmbed.objects.filter(
+                subreddit__iexact=self.subreddit.strip()
+            )
+            .exclude(pk=self.pk)
+            .exclude(posts=[])
+            .values_list("posts", flat=True)
+            .first()
+        )
+
+    def reuse_shared_posts(self):
+        """
+        Store the posts of another embed for the same subreddit, if any.
+
+        Without any, nothing is stored: the fetch times stay empty until posts
+        are actually fetched.
+
+        Returns:
+            bool: True if posts were stored.
+        """
+        posts = self.shared_posts()
+        if not posts:
+            return False
+        self.set_posts(posts)
+        return True
+
+    def update_subreddit_status(self):
+        """Set ``subreddit_status`` from the cached subreddit lookup."""
+        found = cached_subreddit_found(self.subreddit)
+        if found is not None:
+            self.subreddit_status = self.VERIFIED if found else self.NOT_FOUND
+        elif self.subreddit != getattr(self, "_loaded_subreddit", None):
+            self.subreddit_status = self.PENDING
 
     def save(self, *args, **kwargs):
-        """If creation - get the top reddit posts for the ``subreddit``."""
-        if not self.pk:
-            self.update_embedded_posts()
-        return super().save(*args, **kwargs)
+        """
+        If creation - queue ``refresh_embed`` to get the top reddit posts for the
+        ``subreddit``, so saving never waits on Reddit.
+
+        Posts already fetched for another embed of the same subreddit are reused.
+        Posts for a subreddit pending verification are fetched once it's verified.
+        """
+        from .tasks import refresh_embed
+
+        self.update_subreddit_status()
+        created = not self.pk
+        if created:
+            self.reuse_shared_posts()
+        super().save(*args, **kwargs)
+
+        if (
+            created
+            and not self.posts
+            and self.subreddit_status == self.VERIFIED
+        ):
+            transaction.on_commit(lambda: refresh_embed.delay(self.pk))
 
     def __str__(self):
         return self.subreddit
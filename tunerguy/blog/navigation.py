@@ -0,0 +1,110 @@
+"""
+navigation module
+
+This module builds the site's menu from the blog's page tree: the live
+``CarHubPage`` and ``CategoryPage`` children of the ``BlogIndexPage``, each car
+hub listing its live categories.
+
+The menu is the same on every page, so it's rendered once and cached site-wide:
+rendering it costs a single cache read. It's rendered again when a car hub or
+category is published, unpublished, moved or deleted, see
+``tunerguy.blog.signals``. Only if its HTML changed, e.g. a title or slug, are
+the cached pages showing it dropped: most publishes only edit a page's content.
+
+Module Functions:
+    - build_menu(): Returns the menu's structure.
+    - menu_html(): Returns the menu's cached HTML.
+    - render_menu(): Renders the menu's HTML and caches it.
+    - refresh_menu(): Renders the menu again and drops the cached pages showing
+      it if it changed.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+from wagtail.models import Page
+
+from tunerguy.base.navigation import page_urls
+from tunerguy.base.page_cache import depends_on, invalidate
+
+from .models import BlogIndexPage, CarHubPage, CategoryPage
+
+MENU_CACHE_KEY = "navigation:menu"
+MENU_DIGEST_CACHE_KEY = "navigation:menu:digest"
+
+
+def build_menu():
+    """
+    Returns the menu's structure, built with two queries.
+
+    Returns:
+        dict: The ``home`` page's URL and the menu ``items``, in the page tree's
+        order. Each item is a dict with the page's ``title``, ``url`` and, for
+        car hubs, ``children`` items for its categories.
+    """
+    index = BlogIndexPage.objects.live().order_by("path").first()
+    if index is None:
+        return {"home": None, "items": []}
+
+    pages = list(
+        Page.objects.live()
+        .descendant_of(index)
+        .filter(depth__lte=index.depth + 2)
+        .type(CarHubPage, CategoryPage)
+        .order_by("path")
+        .values("title", "url_path", "path", "depth")
+    )
+    urls = page_urls([index.url_path, *(page["url_path"] for page in pages)])
+
+    items = {}
+    for page in pages:
+        item = {"title": page["title"], "url": urls[page["url_path"]]}
+        if page["depth"] == index.depth + 1:
+            items[page["path"]] = {**item, "children": []}
+        else:
+            # Categories of an unpublished car hub aren't shown.
+            parent = items.get(page["path"][: -Page.steplen])
+            if parent is not None:
+                parent["children"].append(item)
+
+    return {"home": urls[index.url_path], "items": list(items.values())}
+
+
+def menu_html():
+    """
+    Returns the menu's HTML, rendered from ``navigation_menu.html`` and cached
+    for ``NAVIGATION_CACHE_TIMEOUT`` seconds.
+    """
+    # Every cached page shows the menu.
+    depends_on(MENU_CACHE_KEY)
+    html = cache.get(MENU_CACHE_KEY)
+    if html is None:
+        html = render_menu()
+    return html
+
+
+def render_menu():
+    """Renders the menu's HTML and caches it."""
+    html = render_to_string("navigation_menu.html", build_menu())
+    cache.set(MENU_CACHE_KEY, html, settings.NAVIGATION_CACHE_TIMEOUT)
+    return html
+
+
+def refresh_menu():
+    """
+    Renders the menu again once the transaction commits, and drops the cached
+    pages showing it if its HTML changed.
+    """
+
+    def refresh_after_commit():
+        digest = hashlib.sha1(render_menu().encode()).hexdigest()
+        # The digest is of the menu pages were last invalidated for, kept
+        # after the menu expires so changes missed meanwhile still count.
+        if cache.get(MENU_DIGEST_CACHE_KEY) != digest:
+            cache.set(MENU_DIGEST_CACHE_KEY, digest, timeout=None)
+            invalidate(MENU_CACHE_KEY)
+
+    transaction.on_commit(refresh_after_commit)
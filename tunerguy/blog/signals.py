@@ -0,0 +1,151 @@
+"""
+signals module
+
+This module keeps denormalized blog data in sync with the page tree.
+
+Module Functions:
+    - update_categories(sender, instance, **kwargs): Rebuilds the
+      ``CategoryLatestPost`` rows and refreshes ``date_of_last_post`` of the
+      categories a post is or was listed in.
+    - move_post(sender, instance, parent_page_after, **kwargs): Lists a moved
+      post in its new category.
+    - update_moved_categories(sender, instance, **kwargs): Rebuilds the
+      ``CategoryLatestPost`` rows of categories whose URL changed.
+    - invalidate_reddit_embed(sender, instance, **kwargs): Invalidates the
+      cached pages showing a ``RedditEmbed``.
+    - update_menu(sender, instance, **kwargs): Renders the site menu again when
+      a car hub or category changes.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from wagtail.models import Page
+from wagtail.signals import (
+    page_published,
+    page_slug_changed,
+    page_unpublished,
+    post_page_move,
+)
+
+from tunerguy.base.page_cache import descendants_key, invalidate
+
+from .models import (
+    BlogIndexPage,
+    BlogPage,
+    CarHubPage,
+    CategoryLatestPost,
+    CategoryPage,
+    RedditEmbed,
+)
+from .navigation import refresh_menu
+
+
+def _listed_in(post_id):
+    return set(
+        CategoryLatestPost.objects.filter(post_id=post_id).values_list(
+            "category_id", flat=True
+        )
+    )
+
+
+def _url_path_changed(kwargs):
+    # post_page_move is also sent when a page is only reordered among its
+    # siblings; page_slug_changed always changes the url_path.
+    return kwargs.get("url_path_before") != kwargs.get("url_path_after") or (
+        "url_path_after" not in kwargs
+    )
+
+
+def _rebuild_categories(category_ids):
+    """
+    Rebuild the latest posts and refresh ``date_of_last_post`` of categories.
+
+    The rebuild runs once the transaction commits, so a post deleted along with
+    its category doesn't recreate rows for the deleted category. The cached
+    pages listing the categories are invalidated again afterwards, so none is
+    cached from the rows being rebuilt.
+    """
+
+    def rebuild():
+        for category_id in category_ids:
+            CategoryLatestPost.rebuild(category_id)
+        CategoryPage.refresh_date_of_last_post(category_ids)
+        listing_ids = set(category_ids)
+        for category in Page.objects.filter(pk__in=category_ids):
+            listing_ids.update(
+                category.get_ancestors().values_list("pk", flat=True)
+            )
+        invalidate(*[descendants_key(page_id) for page_id in listing_ids])
+
+    transaction.on_commit(rebuild)
+
+
+@receiver(page_published, sender=BlogPage)
+@receiver(page_unpublished, sender=BlogPage)
+@receiver(post_delete, sender=BlogPage)
+def update_categories(sender, instance, **kwargs):
+    """
+    Rebuild the latest posts and refresh ``date_of_last_post`` of the categories
+    ``instance`` is or was listed in.
+    """
+    category_ids = _listed_in(instance.pk)
+    if instance.category_id:
+        category_ids.add(instance.category_id)
+    _rebuild_categories(category_ids)
+
+
+@receiver(post_page_move, sender=BlogPage)
+def move_post(sender, instance, parent_page_after, **kwargs):
+    """
+    List a moved post in its new category, and rebuild the latest posts of both
+    categories, which copy its ``url_path``.
+
+    Moving saves the base ``Page``, so ``BlogPage.save()`` doesn't update
+    ``category`` itself.
+    """
+    if not _url_path_changed(kwargs):
+        return
+    BlogPage.objects.filter(pk=instance.pk).update(
+        category_id=parent_page_after.pk
+    )
+    _rebuild_categories(_listed_in(instance.pk) | {parent_page_after.pk})
+
+
+@receiver(page_slug_changed, sender=BlogIndexPage)
+@receiver(page_slug_changed, sender=CarHubPage)
+@receiver(page_slug_changed, sender=CategoryPage)
+@receiver(post_page_move, sender=CarHubPage)
+@receiver(post_page_move, sender=CategoryPage)
+def update_moved_categories(sender, instance, **kwargs):
+    """
+    Rebuild the latest posts of the categories at or below ``instance``, whose
+    posts' ``url_path`` changed along with its own.
+    """
+    if not _url_path_changed(kwargs):
+        return
+    _rebuild_categories(
+        CategoryPage.objects.descendant_of(
+            instance, inclusive=True
+        ).values_list("pk", flat=True)
+    )
+
+
+@receiver(post_save, sender=RedditEmbed)
+@receiver(post_delete, sender=RedditEmbed)
+def invalidate_reddit_embed(sender, instance, **kwargs):
+    """Invalidate the cached pages showing ``instance``."""
+    transaction.on_commit(lambda: invalidate(instance))
+
+
+@receiver(page_published, sender=CarHubPage)
+@receiver(page_unpublished, sender=CarHubPage)
+@receiver(post_page_move, sender=CarHubPage)
+@receiver(post_delete, sender=CarHubPage)
+@receiver(page_published, sender=CategoryPage)
+@receiver(page_unpublished, sender=CategoryPage)
+@receiver(post_page_move, sender=CategoryPage)
+@receiver(post_delete, sender=CategoryPage)
+def update_menu(sender, instance, **kwargs):
+    """Refresh the site menu, which lists car hubs and categories."""
+    refresh_menu()
@@ -1,11 +1,363 @@
+import math
+import time
+from datetime import timedelta
+
+from celery import chord
+from celery.utils.log import get_task_logger
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
 from config.celery import app
+from tunerguy.base.circuit_breaker import CircuitBreaker, CircuitOpenError
+from tunerguy.base.locks import (
+    acquire_lease,
+    release_lease,
+    renew_lease,
+    single_flight,
+)
+from tunerguy.base.page_cache import invalidate
+from tunerguy.base.reddit_api import (
+    breaker_states,
+    get_rate_limiter,
+    get_reddit_posts,
+    normalize_subreddit,
+    store_thumbnails,
+    subreddit_found,
+)
 from tunerguy.blog.models import RedditEmbed
 
+logger = get_task_logger(__name__)
+
+
+# Held from the start of a refresh until its chord callback has stored the
+# posts, so refreshes never overlap.
+REFRESH_LOCK = f"{__name__}.update_reddit"
+
+
+@app.task
+def update_reddit(subreddits=None):
+    """
+    Refresh ``RedditEmbed``'s with the latest posts from their subreddit.
+
+    Embeds are grouped by normalized subreddit name so each subreddit is fetched
+    once, however many embeds point at it. Fetching is fanned out over at most
+    ``REDDIT_REFRESH_CONCURRENCY`` subtasks, each handling a share of the distinct
+    subreddits. ``store_reddit_posts`` collects the results and writes them in a
+    single bulk update.
+
+    Skipped while another refresh holds ``REFRESH_LOCK``. The lock is held until
+    ``store_reddit_posts`` finishes or the chord fails, and renewed by every
+    fetch in between.
+
+    Args:
+        subreddits (list): Subreddits to refresh. Defaults to the subreddit of
+            every embed whose subreddit wasn't found missing.
+
+    Returns:
+        str: The id of the chord, if there was anything to refresh.
+    """
+    lock_token = acquire_lease(REFRESH_LOCK)
+    if lock_token is None:
+        return None
+    return _start_refresh(subreddits, lock_token)
+
+
+def _start_refresh(subreddits, lock_token):
+    # Releases the lock unless the chord starts, which then releases it once
+    # done, see store_reddit_posts and release_refresh_lock.
+    try:
+        if subreddits is None:
+            subreddits = RedditEmbed.objects.exclude(
+                subreddit_status=RedditEmbed.NOT_FOUND
+            ).values_list("subreddit", flat=True)
+        subreddits = sorted({normalize_subreddit(s) for s in subreddits})
+        if not subreddits:
+            release_lease(REFRESH_LOCK, lock_token)
+            return None
+
+        chunk_size = math.ceil(
+            len(subreddits) / settings.REDDIT_REFRESH_CONCURRENCY
+        )
+        header = fetch_subreddit.chunks(
+            [(subreddit, lock_token) for subreddit in subreddits], chunk_size
+        ).group()
+        callback = store_reddit_posts.s(lock_token=lock_token).on_error(
+            release_refresh_lock.s(lock_token=lock_token)
+        )
+        return chord(header)(callback).id
+    except BaseException:
+        release_lease(REFRESH_LOCK, lock_token)
+        raise
+
+
+@app.task
+def release_refresh_lock(request, exc, traceback, lock_token=None):
+    """
+    Errback of the ``update_reddit`` chord: release ``REFRESH_LOCK`` when a
+    fetch or ``store_reddit_posts`` failed.
+    """
+    logger.error("Reddit refresh %s failed: %r", request.id, exc)
+    release_lease(REFRESH_LOCK, lock_token)
+
+
+@app.task
+def dispatch_due_reddit_refreshes():
+    """
+    Refresh the subreddits with at least one embed due a refresh.
+
+    Run frequently by beat; each embed's ``next_refresh_at`` decides how often
+    its subreddit is actually fetched. Skipped while a refresh holds
+    ``REFRESH_LOCK``, leaving due embeds for the next run.
+
+    Due embeds are claimed by pushing ``next_refresh_at`` back by
+    ``REDDIT_REFRESH_TIMEOUT``, so later dispatches don't refetch them while
+    their refresh is in flight. ``store_reddit_posts`` then sets the real next
+    refresh time; a refresh that never completes is retried once the claim
+    runs out.
+
+    Returns:
+        str: The id of the ``update_reddit`` chord, if anything was due.
+    """
+    lock_token = acquire_lease(REFRESH_LOCK)
+    if lock_token is None:
+        return None
+
+    try:
+        now = timezone.now()
+        due = dict(
+            RedditEmbed.objects.exclude(subreddit_status=RedditEmbed.NOT_FOUND)
+            .filter(
+                Q(next_refresh_at__isnull=True) | Q(next_refresh_at__lte=now)
+            )
+            .values_list("pk", "subreddit")
+        )
+        RedditEmbed.objects.filter(pk__in=due).update(
+            next_refresh_at=now
+            + timedelta(seconds=settings.REDDIT_REFRESH_TIMEOUT)
+        )
+    except BaseException:
+        release_lease(REFRESH_LOCK, lock_token)
+        raise
+    return _start_refresh(list(due.values()), lock_token)
+
 
 @app.task
-def update_reddit():
-    embeds = RedditEmbed.objects.all()
+def fetch_subreddit(subreddit, lock_token=None):
+    """
+    Fetch the top posts for ``subreddit`` and store their thumbnails locally.
+
+    Renews ``REFRESH_LOCK`` with ``lock_token`` first, so the lock outlives a
+    refresh however many subreddits it fetches.
+
+    Errors are returned rather than raised so one failing subreddit does not
+    abort the rest of the batch. Getting no posts counts as an error, so the
+    embeds keep serving their last good posts.
+
+    Returns:
+        dict: The subreddit, its posts (``None`` on failure), the error
+        message if any, the time spent in seconds and the rate limit budget
+        left afterwards.
+    """
+    if lock_token is not None:
+        renew_lease(REFRESH_LOCK, lock_token)
+    start = time.monotonic()
+    posts, error = None, None
+    try:
+        posts = get_reddit_posts(subreddit)
+    except CircuitOpenError as exc:
+        logger.info("Skipped r/%s: %s", subreddit, exc)
+        error = repr(exc)
+    except Exception as exc:
+        logger.exception("Failed to fetch r/%s", subreddit)
+        error = repr(exc)
+    else:
+        if not posts:
+            posts, error = None, "No posts returned."
+        else:
+            store_thumbnails(posts)
+
+    return {
+        "subreddit": subreddit,
+        "posts": posts,
+        "error": error,
+        "seconds": round(time.monotonic() - start, 3),
+        "budget": get_rate_limiter().stats()["tokens"],
+    }
+
+
+@app.task
+def store_reddit_posts(chunked_results, lock_token=None):
+    """
+    Chord callback for ``update_reddit``: persist the fetched posts, then
+    release ``REFRESH_LOCK`` held with ``lock_token``.
+
+    Each result is fanned out to every embed sharing its normalized subreddit.
+    Embeds whose posts changed, or were re-ranked, rescored or given thumbnails
+    that previously failed to download, have their posts rewritten. Unchanged
+    ones just have their fetch time and refresh schedule updated.
+
+    Args:
+        chunked_results (list): One list of ``fetch_subreddit`` results per chunk.
+
+    Returns:
+        dict: Number of subreddits fetched, embeds changed, updated and
+        unchanged, the changed ratio, failed subreddits, per-subreddit
+        timing, the lowest rate limit budget left by a fetch and the open
+        circuit breakers.
+    """
+    results = [result for chunk in chunked_results for result in chunk]
+    fetched = {
+        result["subreddit"]: result["posts"]
+        for result in results
+        if result["error"] is None
+    }
+
+    changed, updated, unchanged = [], [], []
+    for reddit_embed in RedditEmbed.objects.only(
+        "subreddit", "posts", "posts_fingerprint", "refresh_interval"
+    ):
+        posts = fetched.get(normalize_subreddit(reddit_embed.subreddit))
+        if posts is None:
+            continue
+        posts_version = reddit_embed.posts_version
+        is_changed = reddit_embed.set_posts(posts)
+        # A new ranking, scores or thumbnails don't count as a change to the
+        # refresh cadence, but are still stored.
+        reddit_embed.schedule_refresh(is_changed)
+        if is_changed:
+            changed.append(reddit_embed)
+        elif reddit_embed.posts_version != posts_version:
+            updated.append(reddit_embed)
+        else:
+            unchanged.append(reddit_embed)
+
+    schedule_fields = [
+        "last_fetched_at",
+        "refresh_interval",
+        "next_refresh_at",
+    ]
+    RedditEmbed.objects.bulk_update(
+        changed,
+        ["posts", "posts_fingerprint", "last_changed_at", *schedule_fields],
+    )
+    RedditEmbed.objects.bulk_update(updated, ["posts", *schedule_fields])
+    RedditEmbed.objects.bulk_update(unchanged, schedule_fields)
+    # bulk_update sends no signals, invalidate the pages showing the embeds.
+    invalidate(*changed, *updated)
+
+    refreshed = len(changed) + len(updated) + len(unchanged)
+    stats = {
+        "fetched": len(results),
+        "changed": len(changed),
+        "updated": len(updated),
+        "unchanged": len(unchanged),
+        "changed_ratio": round(len(changed) / refreshed, 2)
+        if refreshed
+        else 0,
+        "failed": sorted(r["subreddit"] for r in results if r["error"]),
+        "timings": {r["subreddit"]: r["seconds"] for r in results},
+        "budget": min(r["budget"] for r in results),
+        "open_breakers": sorted(
+            subreddit
+            for subreddit, state in breaker_states(
+                [r["subreddit"] for r in results]
+            ).items()
+            if state["status"] == CircuitBreaker.OPEN
+        ),
+    }
+    logger.info("Reddit refresh finished: %s", stats)
+    # On failure, the chord's errback releases the lock instead.
+    if lock_token is not None:
+        release_lease(REFRESH_LOCK, lock_token)
+    return stats
+
+
+@app.task(bind=True, max_retries=3, default_retry_delay=60)
+def refresh_embed(self, pk):
+    """
+    Fetch the first posts of a newly created ``RedditEmbed``.
+
+    Queued by ``RedditEmbed.save()`` so the admin doesn't wait on Reddit. Pages
+    show a placeholder until the posts are stored.
+    """
+    reddit_embed = RedditEmbed.objects.filter(pk=pk).first()
+    if reddit_embed is None:
+        return
+
+    try:
+        changed = reddit_embed.update_embedded_posts()
+    except CircuitOpenError as exc:
+        raise self.retry(exc=exc, countdown=max(exc.retry_at - time.time(), 0))
+    except Exception as exc:
+        raise self.retry(exc=exc)
+
+    reddit_embed.schedule_refresh(changed)
+    # Posts are saved even if unchanged, for their new ranking and scores.
+    update_fields = [
+        "posts",
+        "last_fetched_at",
+        "refresh_interval",
+        "next_refresh_at",
+    ]
+    if changed:
+        update_fields += ["posts_fingerprint", "last_changed_at"]
+    reddit_embed.save(update_fields=update_fields)
+
+
+@app.task
+@single_flight()
+def verify_pending_subreddits():
+    """
+    Confirm the subreddits of embeds saved as pending verification.
+
+    Verified embeds without posts get their first posts fetched. Subreddits that
+    can't be reached are left pending for the next run.
+
+    Returns:
+        dict: Subreddits verified, not found and still pending.
+    """
+    pending = RedditEmbed.objects.filter(subreddit_status=RedditEmbed.PENDING)
+    subreddits = {normalize_subreddit(embed.subreddit) for embed in pending}
+
+    stats = {"verified": [], "not_found": [], "pending": []}
+    for subreddit in sorted(subreddits):
+        try:
+            found = subreddit_found(subreddit)
+        except Exception:
+            logger.exception("Failed to verify r/%s", subreddit)
+            stats["pending"].append(subreddit)
+            continue
+        stats["verified" if found else "not_found"].append(subreddit)
+
+    for reddit_embed in pending:
+        subreddit = normalize_subreddit(reddit_embed.subreddit)
+        if subreddit in stats["pending"]:
+            continue
+        if subreddit in stats["verified"]:
+            reddit_embed.subreddit_status = RedditEmbed.VERIFIED
+            if not reddit_embed.posts:
+                reddit_embed.reuse_shared_posts()
+            if not reddit_embed.posts:
+                try:
+                    reddit_embed.update_embedded_posts()
+                    reddit_embed.schedule_refresh(changed=True)
+                except Exception:
+                    # Left due, so the next dispatch fills the posts.
+                    logger.exception("Failed to fetch r/%s", subreddit)
+        else:
+            reddit_embed.subreddit_status = RedditEmbed.NOT_FOUND
+        reddit_embed.save(
+            update_fields=[
+                "subreddit_status",
+                "posts",
+                "posts_fingerprint",
+                "last_fetched_at",
+                "last_changed_at",
+                "refresh_interval",
+                "next_refresh_at",
+            ]
+        )
 
-    for reddit_embed in embeds:
-        reddit_embed.update_embedded_posts()
-        reddit_embed.save()
+    logger.info("Subreddit verification finished: %s", stats)
+    return stats
@@ -0,0 +1,27 @@
+"""
+navigation_tags module
+
+This module provides the ``{% site_menu %}`` tag, which renders the site's
+cached menu, see ``tunerguy.blog.navigation``.
+
+Module Functions:
+    - site_menu(): Returns the menu's HTML.
+"""
+
+from django import template
+from django.utils.safestring import mark_safe
+
+from tunerguy.blog.navigation import menu_html
+
+register = template.Library()
+
+
+@register.simple_tag
+def site_menu():
+    """
+    Renders the site's menu items, from a single cache read when cached.
+
+    Usage:
+        ``<ul class="navbar-nav">{% site_menu %}</ul>``
+    """
+    return mark_safe(menu_html())
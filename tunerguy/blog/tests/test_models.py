@@ -0,0 +1,92 @@
+from datetime import date
+
+from django.test import TestCase
+
+from tunerguy.blog.models import BlogPage, RedditEmbed
+
+from .utils import build_blog
+
+
+class PaginatePostsTests(TestCase):
+    def setUp(self):
+        _, [(_, [(self.category, self.posts), _])] = build_blog(posts=5)
+
+    def paginate(self, size):
+        titles, cursor = [], None
+        while True:
+            posts, cursor = self.category.paginate_posts(cursor, size=size)
+            titles.append([post.title for post in posts])
+            if cursor is None:
+                return titles
+
+    def test_pages_follow_the_date(self):
+        self.assertEqual(
+            self.paginate(2),
+            [["Post 4", "Post 3"], ["Post 2", "Post 1"], ["Post 0"]],
+        )
+
+    def test_posts_of_the_same_date_are_paged_by_id(self):
+        BlogPage.objects.filter(
+            pk__in=[post.pk for post in self.posts[1:4]]
+        ).update(date=date(2024, 1, 3))
+
+        self.assertEqual(
+            self.paginate(2),
+            [["Post 4", "Post 3"], ["Post 2", "Post 1"], ["Post 0"]],
+        )
+
+
+class RedditEmbedCreationTests(TestCase):
+    def create(self, subreddit):
+        # Pending verification, so nothing is queued to fetch from Reddit.
+        return RedditEmbed.objects.create(title="GTI", subreddit=subreddit)
+
+    def test_new_embed_is_not_marked_fetched(self):
+        embed = self.create("gti")
+
+        self.assertEqual(embed.posts, [])
+        self.assertEqual(embed.posts_fingerprint, "")
+        self.assertIsNone(embed.last_fetched_at)
+        self.assertIsNone(embed.last_changed_at)
+
+    def test_new_embed_reuses_the_posts_of_its_subreddit(self):
+        posts = [{"id": "a1", "title": "Post", "thumbnail": None}]
+        RedditEmbed.objects.filter(pk=self.create("gti").pk).update(
+            posts=posts
+        )
+
+        embed = self.create("GTI")
+
+        self.assertEqual(embed.posts, posts)
+        self.assertEqual(
+            embed.posts_fingerprint, RedditEmbed.fingerprint(posts)
+        )
+        self.assertIsNotNone(embed.last_fetched_at)
+
+
+class SetPostsTests(TestCase):
+    def setUp(self):
+        self.embed = RedditEmbed(title="GTI", subreddit="gti")
+        self.embed.set_posts(
+            [{"id": "a1", "score": 10}, {"id": "b2", "score": 5}]
+        )
+
+    def test_reranked_posts_are_stored_without_counting_as_a_change(self):
+        posts_version = self.embed.posts_version
+        last_changed_at = self.embed.last_changed_at
+        posts = [{"id": "b2", "score": 20}, {"id": "a1", "score": 11}]
+
+        self.assertFalse(self.embed.set_posts(posts))
+        self.assertEqual(self.embed.posts, posts)
+        self.assertEqual(self.embed.last_changed_at, last_changed_at)
+        self.assertNotEqual(self.embed.posts_version, posts_version)
+
+    def test_fetch_time_does_not_change_the_posts_version(self):
+        posts_version = self.embed.posts_version
+        posts = [{"id": "a1", "score": 10}, {"id": "b2", "score": 5}]
+        for post in posts:
+            post["fetched_at"] = 1700000000
+
+        self.embed.set_posts(posts)
+
+        self.assertEqual(self.embed.posts_version, posts_version)
@@ -0,0 +1,38 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from tunerguy.base import page_cache
+from tunerguy.blog import navigation
+
+from .utils import build_blog
+
+
+class MenuRefreshTests(TestCase):
+    """Pages showing the menu are only invalidated when its HTML changes."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        _, [(_, [(self.category, _), _])] = build_blog()
+        with self.captureOnCommitCallbacks(execute=True):
+            navigation.refresh_menu()
+        # A page outside the blog, only invalidated through the menu.
+        self.page_id = 10**6
+        page_cache.record_dependents(self.page_id, [navigation.MENU_CACHE_KEY])
+
+    def publish(self, **fields):
+        for name, value in fields.items():
+            setattr(self.category, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.category.save_revision().publish()
+
+    def test_content_edit_keeps_the_menu(self):
+        self.publish(intro="<p>New intro</p>")
+
+        self.assertEqual(page_cache.page_version(self.page_id), 0)
+
+    def test_title_change_refreshes_the_menu(self):
+        self.publish(title="Coilovers")
+
+        self.assertEqual(page_cache.page_version(self.page_id), 1)
+        self.assertIn("Coilovers", navigation.menu_html())
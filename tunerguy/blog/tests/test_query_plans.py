@@ -0,0 +1,146 @@
+import json
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from tunerguy.blog.management.commands import check_query_plans
+from tunerguy.blog.models import BlogPage, CategoryPage
+
+from .utils import build_blog
+
+
+@skipUnless(connection.vendor == "sqlite", "Asserts on SQLite's plans.")
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        build_blog(hubs=3, categories=4, posts=6)
+        # Plan with statistics, as a long running database would.
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def plans(self):
+        plans = {}
+        for name, queryset, tables, _ in check_query_plans.hot_queries():
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                plans[name] = check_query_plans.sqlite_plan(
+                    cursor, sql, params, tables
+                )
+        return plans
+
+    def test_hot_queries_search_their_indexes(self):
+        for name, (plan, scans, _) in self.plans().items():
+            with self.subTest(name):
+                self.assertFalse(scans, plan)
+
+    def test_next_page_seeks_past_the_cursor(self):
+        plan, _, sorts = self.plans()["Category listing, next page"]
+
+        self.assertIn(
+            "SEARCH blog_blogpage USING INDEX blogpage_category_date_idx "
+            "(category_id=? AND date<?)",
+            plan,
+        )
+        self.assertFalse(sorts)
+
+    def test_scans_of_any_table_are_reported(self):
+        hub = CategoryPage.objects.first().get_parent()
+        queries = {
+            "unindexed filter": BlogPage.objects.filter(snippet="Snippet"),
+            # Reads every category to find the hub's.
+            "prefix match": CategoryPage.objects.child_of(hub)
+            .live()
+            .order_by("-date_of_last_post"),
+        }
+        for name, queryset in queries.items():
+            sql, params = queryset.query.sql_with_params()
+            with self.subTest(name), connection.cursor() as cursor:
+                plan, scans, _ = check_query_plans.sqlite_plan(
+                    cursor,
+                    sql,
+                    params,
+                    [BlogPage._meta.db_table, CategoryPage._meta.db_table],
+                )
+                self.assertTrue(scans, plan)
+
+    def test_command_passes(self):
+        out = StringIO()
+        call_command("check_query_plans", stdout=out)
+
+        self.assertEqual(
+            out.getvalue().count("ok: "), len(check_query_plans.hot_queries())
+        )
+
+
+class PostgreSQLPlanTests(SimpleTestCase):
+    """``postgresql_plan`` on plans as PostgreSQL's EXPLAIN (FORMAT JSON)."""
+
+    tables = ["wagtailcore_page", "blog_categorypage"]
+
+    def explain(self, plan):
+        cursor = FakeCursor([{"Plan": plan}])
+        _, scans, sorts = check_query_plans.postgresql_plan(
+            cursor, "SELECT ...", [], self.tables
+        )
+        self.assertEqual(cursor.executed[0], "SET LOCAL enable_seqscan = off")
+        return scans, sorts
+
+    def scan(self, node_type, table, **fields):
+        return {"Node Type": node_type, "Relation Name": table, **fields}
+
+    def test_searches_through_indexes_pass(self):
+        plan = {
+            "Node Type": "Sort",
+            "Plans": [
+                {
+                    "Node Type": "Nested Loop",
+                    "Plans": [
+                        self.scan(
+                            "Index Scan",
+                            "wagtailcore_page",
+                            **{"Index Cond": "path >= '0001' AND ..."},
+                        ),
+                        self.scan(
+                            "Index Only Scan",
+                            "blog_categorypage",
+                            **{
+                                "Index Cond": "page_ptr_id = wagtailcore_page.id"
+                            },
+                        ),
+                    ],
+                }
+            ],
+        }
+
+        self.assertEqual(self.explain(plan), (False, True))
+
+    def test_full_scans_are_reported(self):
+        plans = {
+            "sequential scan": self.scan("Seq Scan", "blog_categorypage"),
+            "whole index": self.scan("Index Scan", "blog_categorypage"),
+        }
+        for name, plan in plans.items():
+            with self.subTest(name):
+                self.assertEqual(self.explain(plan), (True, False))
+
+    def test_scans_of_other_tables_are_ignored(self):
+        plan = self.scan("Seq Scan", "wagtailcore_locale")
+
+        self.assertEqual(self.explain(plan), (False, False))
+
+
+class FakeCursor:
+    """Returns ``plan`` to EXPLAIN, as JSON text like some drivers do."""
+
+    def __init__(self, plan):
+        self.plan = plan
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return [json.dumps(self.plan)]
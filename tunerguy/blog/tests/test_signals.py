@@ -0,0 +1,65 @@
+from django.test import TestCase
+
+from tunerguy.blog.models import (
+    BlogPage,
+    CarHubPage,
+    CategoryLatestPost,
+    CategoryPage,
+)
+
+from .utils import build_blog
+
+
+def listed_urls(category):
+    return set(
+        CategoryLatestPost.objects.filter(category=category).values_list(
+            "url_path", flat=True
+        )
+    )
+
+
+class LatestPostUrlTests(TestCase):
+    """``CategoryLatestPost`` rows follow the ``url_path`` of their posts."""
+
+    def setUp(self):
+        _, [(self.hub, categories)] = build_blog()
+        [(self.category, self.posts), (self.other, _)] = categories
+        for category, _ in categories:
+            CategoryLatestPost.rebuild(category.pk)
+
+    def test_category_slug_change(self):
+        category = CategoryPage.objects.get(pk=self.category.pk)
+        category.slug = "renamed"
+        with self.captureOnCommitCallbacks(execute=True):
+            category.save_revision().publish()
+
+        self.assertEqual(
+            listed_urls(category),
+            {"/blog/hub-0/renamed/post-0/", "/blog/hub-0/renamed/post-1/"},
+        )
+
+    def test_car_hub_slug_change(self):
+        hub = CarHubPage.objects.get(pk=self.hub.pk)
+        hub.slug = "golf"
+        with self.captureOnCommitCallbacks(execute=True):
+            hub.save_revision().publish()
+
+        self.assertEqual(
+            listed_urls(self.other),
+            {"/blog/golf/cat-1/post-0/", "/blog/golf/cat-1/post-1/"},
+        )
+
+    def test_post_move(self):
+        post = BlogPage.objects.get(pk=self.posts[1].pk)
+        post.slug = "moved"
+        post.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            post.move(CategoryPage.objects.get(pk=self.other.pk), "last-child")
+
+        self.assertEqual(
+            BlogPage.objects.get(pk=post.pk).category_id, self.other.pk
+        )
+        self.assertEqual(
+            listed_urls(self.category), {"/blog/hub-0/cat-0/post-0/"}
+        )
+        self.assertIn("/blog/hub-0/cat-1/moved/", listed_urls(self.other))
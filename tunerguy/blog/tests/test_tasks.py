@@ -0,0 +1,120 @@
+from unittest import mock
+
+import fakeredis
+from django.test import TestCase
+
+from config.celery import app
+from tunerguy.base import locks
+from tunerguy.blog import tasks
+from tunerguy.blog.models import RedditEmbed
+
+
+def reddit_posts(subreddit):
+    return [{"id": f"{subreddit}1", "title": "Post", "thumbnail": None}]
+
+
+class RefreshLockTests(TestCase):
+    """``REFRESH_LOCK`` is held from ``update_reddit`` to its chord callback."""
+
+    def setUp(self):
+        always_eager = app.conf.task_always_eager
+        app.conf.task_always_eager = True
+        self.addCleanup(setattr, app.conf, "task_always_eager", always_eager)
+        patchers = [
+            mock.patch.object(locks, "_redis", fakeredis.FakeRedis()),
+            # Saving an embed would look the subreddit up on Reddit.
+            mock.patch.object(RedditEmbed, "update_subreddit_status"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        RedditEmbed.objects.create(
+            title="GTI",
+            subreddit="gti",
+            subreddit_status=RedditEmbed.VERIFIED,
+        )
+
+    def test_lock_is_held_until_the_posts_are_stored(self):
+        held = []
+
+        def fetch(subreddit):
+            held.append(locks.acquire_lease(tasks.REFRESH_LOCK) is None)
+            return reddit_posts(subreddit)
+
+        store = tasks.store_reddit_posts.run
+
+        def store_posts(chunked_results, lock_token=None):
+            held.append(locks.acquire_lease(tasks.REFRESH_LOCK) is None)
+            return store(chunked_results, lock_token=lock_token)
+
+        with mock.patch.object(
+            tasks, "get_reddit_posts", fetch
+        ), mock.patch.object(tasks.store_reddit_posts, "run", store_posts):
+            tasks.update_reddit()
+
+        self.assertEqual(held, [True, True])
+        self.assertEqual(RedditEmbed.objects.get().post_ids, ["gti1"])
+        # Released once the posts are stored.
+        self.assertIsNotNone(locks.acquire_lease(tasks.REFRESH_LOCK))
+
+    def test_refreshes_are_skipped_while_one_is_running(self):
+        locks.acquire_lease(tasks.REFRESH_LOCK)
+
+        with mock.patch.object(tasks, "get_reddit_posts") as fetch:
+            self.assertIsNone(tasks.update_reddit())
+            self.assertIsNone(tasks.dispatch_due_reddit_refreshes())
+
+        fetch.assert_not_called()
+        self.assertEqual(locks.skipped_runs(tasks.REFRESH_LOCK), 2)
+        # Due embeds aren't claimed by a skipped dispatch.
+        self.assertIsNone(RedditEmbed.objects.get().next_refresh_at)
+
+    def test_lock_is_released_when_storing_fails(self):
+        with mock.patch.object(
+            tasks, "get_reddit_posts", reddit_posts
+        ), mock.patch.object(
+            tasks, "invalidate", side_effect=RuntimeError("cache down")
+        ):
+            tasks.update_reddit()
+
+        self.assertIsNotNone(locks.acquire_lease(tasks.REFRESH_LOCK))
+
+    def test_lock_is_released_when_there_is_nothing_to_refresh(self):
+        self.assertIsNone(tasks.update_reddit(subreddits=[]))
+
+        self.assertIsNotNone(locks.acquire_lease(tasks.REFRESH_LOCK))
+
+
+class StoreRedditPostsTests(TestCase):
+    def setUp(self):
+        patchers = [
+            mock.patch.object(locks, "_redis", fakeredis.FakeRedis()),
+            mock.patch.object(RedditEmbed, "update_subreddit_status"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.embed = RedditEmbed.objects.create(
+            title="GTI",
+            subreddit="gti",
+            subreddit_status=RedditEmbed.VERIFIED,
+        )
+
+    def store(self, posts):
+        result = {
+            "subreddit": "gti",
+            "posts": posts,
+            "error": None,
+            "seconds": 0.1,
+            "budget": 100,
+        }
+        return tasks.store_reddit_posts([[result]])
+
+    def test_reranked_posts_are_stored(self):
+        self.store([{"id": "a1", "score": 10}, {"id": "b2", "score": 5}])
+
+        posts = [{"id": "b2", "score": 20}, {"id": "a1", "score": 11}]
+        stats = self.store(posts)
+
+        self.assertEqual((stats["changed"], stats["updated"]), (0, 1))
+        self.assertEqual(RedditEmbed.objects.get().posts, posts)
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from wagtail.models import Page, Site
+
+from tunerguy.blog.models import (
+    BlogIndexPage,
+    BlogPage,
+    CarHubPage,
+    CategoryPage,
+)
+
+
+def build_blog(hubs=1, categories=2, posts=2):
+    """
+    Build a blog index as the site root, with ``categories`` categories under
+    each of ``hubs`` car hubs and ``posts`` posts in each category.
+
+    Returns the index and a list of ``(hub, [(category, [post, ...]), ...])``.
+    """
+    index = Page.get_first_root_node().add_child(
+        instance=BlogIndexPage(title="Blog", slug="blog")
+    )
+    Site.objects.update(root_page=index)
+    author = get_user_model().objects.create(
+        username="author", first_name="Tuner", last_name="Guy"
+    )
+    tree = []
+    for h in range(hubs):
+        hub = index.add_child(
+            instance=CarHubPage(
+                title=f"Hub {h}", slug=f"hub-{h}", intro="<p>Intro</p>"
+            )
+        )
+        hub_categories = []
+        for c in range(categories):
+            category = hub.add_child(
+                instance=CategoryPage(
+                    title=f"Category {c}",
+                    slug=f"cat-{c}",
+                    intro="<p>Intro</p>",
+                )
+            )
+            category_posts = [
+                category.add_child(
+                    instance=BlogPage(
+                        title=f"Post {p}",
+                        slug=f"post-{p}",
+                        author=author,
+                        date=date(2024, 1, 1) + timedelta(days=p),
+                        snippet="Snippet",
+                        featured_image="featured_image/post.jpg",
+                        body=[],
+                    )
+                )
+                for p in range(posts)
+            ]
+            hub_categories.append((category, category_posts))
+        tree.append((hub, hub_categories))
+    return index, tree
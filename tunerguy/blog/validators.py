@@ -1,6 +1,6 @@
 from django.core.exceptions import ValidationError
 
-from tunerguy.base.reddit_api import subreddit_found
+from tunerguy.base.reddit_api import subreddit_exists
 
 
 def validate_subreddit_format(subreddit):
@@ -12,8 +12,9 @@ def validate_subreddit_format(subreddit):
 
 
 def validate_subreddit_exists(subreddit):
-    # Subreddit must already exist
-    if not subreddit_found(subreddit):
+    # Subreddit must already exist. Lookups that can't complete in time are
+    # let through, the embed is then saved as pending verification.
+    if subreddit_exists(subreddit) is False:
         raise ValidationError(
             "Subreddit was not found, please check the name or try again later."
         )